@@ -3,19 +3,18 @@ backend/app/api/alerts.py
 API endpoints for user alerts and notifications
 """
 
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Depends
 from typing import List
-from datetime import datetime
 from app.models.trends import Alert
+from app.services.alert_store import AlertStore
+from app.services.alert_evaluator import AlertEvaluator
+from app.api.dependencies import get_alert_store, get_alert_evaluator
 from app.utils.logger import get_logger
 import uuid
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
-# In-memory storage (use database in production)
-alerts_db = {}
-
 
 @router.post("/", response_model=Alert)
 async def create_alert(
@@ -23,7 +22,8 @@ async def create_alert(
     keywords: List[str] = Body([]),
     categories: List[str] = Body([]),
     min_trend_score: float = Body(0.7),
-    platforms: List[str] = Body([])
+    platforms: List[str] = Body([]),
+    store: AlertStore = Depends(get_alert_store)
 ):
     """Create a new trend alert"""
     try:
@@ -39,7 +39,7 @@ async def create_alert(
             active=True
         )
         
-        alerts_db[alert_id] = alert
+        await store.save(alert)
         
         logger.info(f"Created alert {alert_id} for user {user_id}")
         return alert
@@ -50,15 +50,13 @@ async def create_alert(
 
 
 @router.get("/user/{user_id}", response_model=List[Alert])
-async def get_user_alerts(user_id: str):
+async def get_user_alerts(
+    user_id: str,
+    store: AlertStore = Depends(get_alert_store)
+):
     """Get all alerts for a user"""
     try:
-        user_alerts = [
-            alert for alert in alerts_db.values()
-            if alert.user_id == user_id
-        ]
-        
-        return user_alerts
+        return await store.get_user_alerts(user_id)
     
     except Exception as e:
         logger.error(f"Error fetching user alerts: {str(e)}")
@@ -72,15 +70,15 @@ async def update_alert(
     categories: List[str] = Body(None),
     min_trend_score: float = Body(None),
     platforms: List[str] = Body(None),
-    active: bool = Body(None)
+    active: bool = Body(None),
+    store: AlertStore = Depends(get_alert_store)
 ):
     """Update an existing alert"""
     try:
-        if alert_id not in alerts_db:
+        alert = await store.get(alert_id)
+        if not alert:
             raise HTTPException(status_code=404, detail="Alert not found")
         
-        alert = alerts_db[alert_id]
-        
         if keywords is not None:
             alert.keywords = keywords
         if categories is not None:
@@ -92,7 +90,7 @@ async def update_alert(
         if active is not None:
             alert.active = active
         
-        alerts_db[alert_id] = alert
+        await store.save(alert)
         
         logger.info(f"Updated alert {alert_id}")
         return alert
@@ -105,13 +103,17 @@ async def update_alert(
 
 
 @router.delete("/{alert_id}")
-async def delete_alert(alert_id: str):
+async def delete_alert(
+    alert_id: str,
+    store: AlertStore = Depends(get_alert_store)
+):
     """Delete an alert"""
     try:
-        if alert_id not in alerts_db:
+        alert = await store.get(alert_id)
+        if not alert:
             raise HTTPException(status_code=404, detail="Alert not found")
         
-        del alerts_db[alert_id]
+        await store.delete(alert)
         
         logger.info(f"Deleted alert {alert_id}")
         return {"message": "Alert deleted successfully"}
@@ -124,14 +126,17 @@ async def delete_alert(alert_id: str):
 
 
 @router.get("/{alert_id}/check")
-async def check_alert(alert_id: str):
+async def check_alert(
+    alert_id: str,
+    store: AlertStore = Depends(get_alert_store),
+    evaluator: AlertEvaluator = Depends(get_alert_evaluator)
+):
     """Check if alert conditions are met"""
     try:
-        if alert_id not in alerts_db:
+        alert = await store.get(alert_id)
+        if not alert:
             raise HTTPException(status_code=404, detail="Alert not found")
         
-        alert = alerts_db[alert_id]
-        
         if not alert.active:
             return {
                 "alert_id": alert_id,
@@ -139,30 +144,13 @@ async def check_alert(alert_id: str):
                 "reason": "Alert is inactive"
             }
         
-        from app.services.data_aggregator import DataAggregator
-        
-        aggregator = DataAggregator()
-        products = await aggregator.aggregate_product_trends(
-            keywords=alert.keywords,
-            categories=alert.categories,
-            days_back=1
-        )
-        
-        # Filter by alert criteria
-        matching_products = [
-            p for p in products
-            if p.trend_score >= alert.min_trend_score
-            and (not alert.platforms or any(pl in p.platforms for pl in alert.platforms))
-        ]
-        
-        triggered = len(matching_products) > 0
+        # Results are kept fresh by the periodic evaluator
+        state = await store.get_state(alert_id)
+        if state is None:
+            # New or just-updated alert, not evaluated yet
+            state = await evaluator.evaluate(alert)
         
-        return {
-            "alert_id": alert_id,
-            "triggered": triggered,
-            "matching_products": [p.dict() for p in matching_products[:5]],
-            "checked_at": datetime.utcnow().isoformat()
-        }
+        return state
     
     except HTTPException:
         raise
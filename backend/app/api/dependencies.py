@@ -0,0 +1,41 @@
+"""
+backend/app/api/dependencies.py
+Shared service dependencies for API routes
+"""
+
+from functools import lru_cache
+from app.services.data_aggregator import DataAggregator
+from app.services.amazon_q_service import AmazonQService
+from app.services.bedrock_agent import BedrockAgentService
+from app.services.alert_store import AlertStore
+from app.services.alert_evaluator import AlertEvaluator
+
+
+@lru_cache()
+def get_aggregator() -> DataAggregator:
+    """Get cached data aggregator instance"""
+    return DataAggregator()
+
+
+@lru_cache()
+def get_amazon_q() -> AmazonQService:
+    """Get cached Amazon Q service instance"""
+    return AmazonQService()
+
+
+@lru_cache()
+def get_bedrock() -> BedrockAgentService:
+    """Get cached Bedrock agent service instance"""
+    return BedrockAgentService()
+
+
+@lru_cache()
+def get_alert_store() -> AlertStore:
+    """Get cached alert store instance"""
+    return AlertStore()
+
+
+@lru_cache()
+def get_alert_evaluator() -> AlertEvaluator:
+    """Get cached alert evaluator instance"""
+    return AlertEvaluator(get_aggregator(), get_alert_store())
@@ -3,28 +3,57 @@ backend/app/api/products.py
 API endpoints for product operations
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
-from app.models.trends import ProductComparison, EventRecommendation, MerchantInsight, ConsumerInsight
+from functools import lru_cache
+from collections import defaultdict
+from operator import attrgetter
+import asyncio
+import heapq
+from app.models.trends import ProductComparison, EventRecommendation, MerchantInsight, ConsumerInsight, TrendStatus
 from app.services.data_aggregator import DataAggregator
 from app.services.amazon_q_service import AmazonQService
-from app.config import CALENDAR_EVENTS
+from app.api.dependencies import get_aggregator, get_amazon_q
+from app.config import CALENDAR_BY_ORDINAL
 from app.utils.logger import get_logger
+from app.utils.cache import cached
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Max concurrent upstream aggregations per event recommendations request
+EVENT_FETCH_CONCURRENCY = 8
+
+# Calendar events as (month, day, event_info)
+_EVENTS_PARSED = [
+    (ordinal // 100, ordinal % 100, event_info)
+    for ordinal, event_info in CALENDAR_BY_ORDINAL.items()
+]
+
+
+@lru_cache(maxsize=2)
+def _event_dates(year: int) -> List[Tuple[datetime, datetime, dict]]:
+    """Resolve calendar events to their dates in the given and following year"""
+    return [
+        (datetime(year, month, day), datetime(year + 1, month, day), event_info)
+        for month, day, event_info in _EVENTS_PARSED
+    ]
+
+
+def _has_recommendations(recommendations: List[EventRecommendation]) -> bool:
+    """Whether every upcoming event got products; empty ones usually mean an upstream failure"""
+    return bool(recommendations) and all(r.recommended_products for r in recommendations)
+
 
 @router.get("/compare/{product_name}", response_model=ProductComparison)
 async def compare_product_prices(
     product_name: str,
-    platforms: Optional[List[str]] = Query(None)
+    platforms: Optional[List[str]] = Query(None),
+    aggregator: DataAggregator = Depends(get_aggregator)
 ):
     """Compare product prices across platforms"""
     try:
-        aggregator = DataAggregator()
-        
         # Default to all e-commerce platforms
         if not platforms:
             platforms = ['amazon', 'walmart', 'ebay', 'etsy', 'target']
@@ -42,56 +71,64 @@ async def compare_product_prices(
 
 
 @router.get("/events", response_model=List[EventRecommendation])
+@cached("event_recommendations", should_cache=_has_recommendations)
 async def get_event_recommendations(
-    days_ahead: int = Query(30, ge=1, le=90)
+    days_ahead: int = Query(30, ge=1, le=90),
+    aggregator: DataAggregator = Depends(get_aggregator)
 ):
     """Get product recommendations for upcoming events"""
     try:
         today = datetime.utcnow()
         recommendations = []
         
-        for date_str, event_info in CALENDAR_EVENTS.items():
-            month, day = map(int, date_str.split('-'))
-            event_date = datetime(today.year, month, day)
-            
+        upcoming_events = []
+        for this_year_date, next_year_date, event_info in _event_dates(today.year):
             # If event already passed this year, check next year
-            if event_date < today:
-                event_date = datetime(today.year + 1, month, day)
+            event_date = this_year_date if this_year_date >= today else next_year_date
             
             days_until = (event_date - today).days
             
             if 0 <= days_until <= days_ahead:
-                # Fetch trending products for this event
-                aggregator = DataAggregator()
-                products = await aggregator.aggregate_product_trends(
+                upcoming_events.append((event_date, days_until, event_info))
+        
+        # Fetch trending products for all events concurrently
+        semaphore = asyncio.Semaphore(EVENT_FETCH_CONCURRENCY)
+        
+        async def fetch_event_products(event_info: dict):
+            async with semaphore:
+                return await aggregator.aggregate_product_trends(
                     keywords=[event_info['name']],
                     categories=event_info.get('categories', []),
                     days_back=14
                 )
-                
-                # Sort by trend score
-                products.sort(key=lambda x: x.trend_score, reverse=True)
-                top_products = products[:10]
-                
-                # Determine urgency
-                if days_until < 7:
-                    urgency = "high"
-                elif days_until < 14:
-                    urgency = "medium"
-                else:
-                    urgency = "low"
-                
-                recommendation = EventRecommendation(
-                    event_name=event_info['name'],
-                    event_date=event_date,
-                    days_until_event=days_until,
-                    recommended_products=top_products,
-                    best_platforms=[],  # TODO: Calculate best platforms
-                    price_trends={},  # TODO: Calculate price trends
-                    buying_urgency=urgency
-                )
-                
-                recommendations.append(recommendation)
+        
+        event_products = await asyncio.gather(
+            *(fetch_event_products(event_info) for _, _, event_info in upcoming_events)
+        )
+        
+        for (event_date, days_until, event_info), products in zip(upcoming_events, event_products):
+            # Top products by trend score
+            top_products = heapq.nlargest(10, products, key=attrgetter('trend_score'))
+            
+            # Determine urgency
+            if days_until < 7:
+                urgency = "high"
+            elif days_until < 14:
+                urgency = "medium"
+            else:
+                urgency = "low"
+            
+            recommendation = EventRecommendation(
+                event_name=event_info['name'],
+                event_date=event_date,
+                days_until_event=days_until,
+                recommended_products=top_products,
+                best_platforms=[],  # TODO: Calculate best platforms
+                price_trends={},  # TODO: Calculate price trends
+                buying_urgency=urgency
+            )
+            
+            recommendations.append(recommendation)
         
         # Sort by date
         recommendations.sort(key=lambda x: x.event_date)
@@ -104,12 +141,12 @@ async def get_event_recommendations(
 
 
 @router.get("/merchant-insights/{product_id}", response_model=MerchantInsight)
-async def get_merchant_insights(product_id: str):
+async def get_merchant_insights(
+    product_id: str,
+    aggregator: DataAggregator = Depends(get_aggregator)
+):
     """Get merchant-specific insights for a product"""
     try:
-        aggregator = DataAggregator()
-        amazon_q = AmazonQService()
-        
         # Fetch product details
         products = await aggregator.aggregate_product_trends(
             keywords=[product_id],
@@ -117,7 +154,7 @@ async def get_merchant_insights(product_id: str):
             days_back=7
         )
         
-        product = next((p for p in products if p.id == product_id), None)
+        product = {p.id: p for p in products}.get(product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
@@ -144,13 +181,13 @@ async def get_merchant_insights(product_id: str):
         ]
         
         # Inventory recommendation
-        if product.status.value == 'emerging':
+        if product.status is TrendStatus.EMERGING:
             stock_recommendation = 'moderate'
             suggested_units = 50
-        elif product.status.value == 'rising':
+        elif product.status is TrendStatus.RISING:
             stock_recommendation = 'high'
             suggested_units = 200
-        elif product.status.value == 'peak':
+        elif product.status is TrendStatus.PEAK:
             stock_recommendation = 'very_high'
             suggested_units = 500
         else:
@@ -200,11 +237,12 @@ async def get_merchant_insights(product_id: str):
 
 
 @router.get("/consumer-insights/{product_id}", response_model=ConsumerInsight)
-async def get_consumer_insights(product_id: str):
+async def get_consumer_insights(
+    product_id: str,
+    aggregator: DataAggregator = Depends(get_aggregator)
+):
     """Get consumer-specific insights for a product"""
     try:
-        aggregator = DataAggregator()
-        
         # Fetch product details
         products = await aggregator.aggregate_product_trends(
             keywords=[product_id],
@@ -212,7 +250,14 @@ async def get_consumer_insights(product_id: str):
             days_back=7
         )
         
-        product = next((p for p in products if p.id == product_id), None)
+        # Index by ID and category in one pass for the lookups below
+        by_id = {}
+        by_category = defaultdict(list)
+        for p in products:
+            by_id[p.id] = p
+            by_category[p.category].append(p)
+        
+        product = by_id.get(product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
@@ -227,11 +272,11 @@ async def get_consumer_insights(product_id: str):
             price_trend = "decreasing"
         
         # Best time to buy
-        if product.status.value == 'emerging':
+        if product.status is TrendStatus.EMERGING:
             best_time = "Buy now - price may increase as popularity grows"
-        elif product.status.value == 'peak':
+        elif product.status is TrendStatus.PEAK:
             best_time = "Wait - price may drop soon as trend peaks"
-        elif product.status.value == 'declining':
+        elif product.status is TrendStatus.DECLINING:
             best_time = "Good time to buy - prices dropping"
         else:
             best_time = "Stable - buy when convenient"
@@ -257,8 +302,8 @@ async def get_consumer_insights(product_id: str):
         
         # Find similar trending products
         similar_products = [
-            p.id for p in products
-            if p.category == product.category and p.id != product_id
+            p.id for p in by_category[product.category]
+            if p.id != product_id
         ][:5]
         
         insight = ConsumerInsight(
@@ -284,12 +329,11 @@ async def get_consumer_insights(product_id: str):
 async def check_product_compliance(
     product_name: str,
     category: str,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    amazon_q: AmazonQService = Depends(get_amazon_q)
 ):
     """Check product compliance across platforms"""
     try:
-        amazon_q = AmazonQService()
-        
         product_data = {
             'name': product_name,
             'category': category,
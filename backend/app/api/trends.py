@@ -4,33 +4,44 @@ API endpoints for trend data
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
-from datetime import datetime
+from collections import Counter, defaultdict
+from operator import attrgetter
+import heapq
+import time
 from app.models.trends import Product, TrendReport, TrendPrediction, TrendStatus, UserType
 from app.services.data_aggregator import DataAggregator
-from app.services.bedrock_agent import BedrockAgentService
+from app.services.bedrock_agent import BedrockAgentService, PRODUCT_TAG_TTL, product_tag
+from app.api.dependencies import get_aggregator, get_bedrock
 from app.utils.logger import get_logger
-from app.utils.metrics import MetricsCollector
+from app.utils.metrics import get_metrics_collector
+from app.utils.cache import cached, has_results
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/trends", tags=["trends"])
-metrics = MetricsCollector()
+metrics = get_metrics_collector()
+
+
+def _has_prediction(prediction: TrendPrediction) -> bool:
+    """Whether a prediction is a real one rather than the zero-confidence fallback"""
+    return prediction.confidence_score > 0
 
 
 @router.get("/products", response_model=List[Product])
+@cached("trending_products", should_cache=has_results)
 async def get_trending_products(
     categories: Optional[List[str]] = Query(None),
     platforms: Optional[List[str]] = Query(None),
     min_score: float = Query(0.5, ge=0, le=1),
     limit: int = Query(50, ge=1, le=200),
-    status: Optional[TrendStatus] = None
+    status: Optional[TrendStatus] = None,
+    aggregator: DataAggregator = Depends(get_aggregator)
 ):
     """Get trending products with filters"""
-    start_time = datetime.utcnow()
+    start_time = time.perf_counter()
     
     try:
-        aggregator = DataAggregator()
-        
         # Default keywords if no categories provided
         keywords = categories or ["trending", "viral", "popular"]
         
@@ -41,25 +52,24 @@ async def get_trending_products(
         )
         
         # Filter by criteria
-        filtered = [
+        platforms_set = frozenset(platforms or ())
+        filtered = (
             p for p in products
             if p.trend_score >= min_score
-            and (not platforms or any(pl in p.platforms for pl in platforms))
+            and (not platforms_set or not platforms_set.isdisjoint(p.platforms))
             and (not status or p.status == status)
-        ]
-        
-        # Sort by trend score
-        filtered.sort(key=lambda x: x.trend_score, reverse=True)
+        )
         
-        # Limit results
-        result = filtered[:limit]
+        # Top results by trend score
+        result = heapq.nlargest(limit, filtered, key=attrgetter('trend_score'))
         
         # Record metrics
-        duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+        duration = (time.perf_counter() - start_time) * 1000
         avg_score = sum(p.trend_score for p in result) / len(result) if result else 0
         metrics.record_trend_analysis(len(result), avg_score, duration)
         
-        return result
+        # Products are already validated models; skip response_model re-validation
+        return ORJSONResponse([p.model_dump(mode="json") for p in result])
     
     except Exception as e:
         logger.error(f"Error fetching trending products: {str(e)}")
@@ -67,18 +77,20 @@ async def get_trending_products(
 
 
 @router.get("/products/{product_id}", response_model=Product)
-async def get_product_details(product_id: str):
+async def get_product_details(
+    product_id: str,
+    aggregator: DataAggregator = Depends(get_aggregator)
+):
     """Get detailed information about a specific product"""
     try:
         # In production, fetch from database
-        aggregator = DataAggregator()
         products = await aggregator.aggregate_product_trends(
             keywords=[product_id],
             categories=[],
             days_back=7
         )
         
-        product = next((p for p in products if p.id == product_id), None)
+        product = {p.id: p for p in products}.get(product_id)
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
@@ -93,11 +105,18 @@ async def get_product_details(product_id: str):
 
 
 @router.get("/predictions/{product_id}", response_model=TrendPrediction)
-async def get_trend_prediction(product_id: str):
+@cached(
+    "trend_prediction",
+    should_cache=_has_prediction,
+    tags=lambda product_id, **_: [product_tag(product_id)],
+    tag_expire=PRODUCT_TAG_TTL
+)
+async def get_trend_prediction(
+    product_id: str,
+    bedrock: BedrockAgentService = Depends(get_bedrock)
+):
     """Get ML prediction for product trend"""
     try:
-        bedrock = BedrockAgentService()
-        
         # Fetch historical data (simplified)
         historical_data = []  # In production, fetch from database
         
@@ -125,12 +144,11 @@ async def get_trend_prediction(product_id: str):
 async def generate_trend_report(
     user_type: UserType = Query(...),
     categories: Optional[List[str]] = Query(None),
-    days_back: int = Query(7, ge=1, le=30)
+    days_back: int = Query(7, ge=1, le=30),
+    aggregator: DataAggregator = Depends(get_aggregator)
 ):
     """Generate comprehensive trend report"""
     try:
-        aggregator = DataAggregator()
-        
         keywords = categories or ["trending", "popular", "viral"]
         
         products = await aggregator.aggregate_product_trends(
@@ -139,33 +157,40 @@ async def generate_trend_report(
             days_back=days_back
         )
         
-        # Sort products
-        top_trending = sorted(products, key=lambda x: x.trend_score, reverse=True)[:20]
-        emerging_trends = [p for p in products if p.status == TrendStatus.EMERGING][:10]
+        # Top products
+        top_trending = heapq.nlargest(20, products, key=attrgetter('trend_score'))
         
-        # Category breakdown
-        category_breakdown = {}
+        # Emerging trends, category breakdown and platform totals in one pass
+        emerging_trends = []
+        category_breakdown = defaultdict(int)
+        platform_counts = Counter()
+        platform_scores = defaultdict(float)
         for product in products:
-            category_breakdown[product.category] = category_breakdown.get(product.category, 0) + 1
+            if product.status == TrendStatus.EMERGING and len(emerging_trends) < 10:
+                emerging_trends.append(product)
+            category_breakdown[product.category] += 1
+            for platform in product.platforms:
+                platform_counts[platform] += 1
+                platform_scores[platform] += product.trend_score
         
         # Platform analysis
-        platform_analysis = {}
-        for platform in ['amazon', 'youtube', 'tiktok', 'instagram', 'meta']:
-            platform_products = [p for p in products if platform in p.platforms]
-            platform_analysis[platform] = {
-                'product_count': len(platform_products),
-                'avg_score': sum(p.trend_score for p in platform_products) / len(platform_products) if platform_products else 0
+        platform_analysis = {
+            platform: {
+                'product_count': platform_counts[platform],
+                'avg_score': platform_scores[platform] / platform_counts[platform] if platform_counts[platform] else 0
             }
+            for platform in ('amazon', 'youtube', 'tiktok', 'instagram', 'meta')
+        }
         
         # Generate insights
-        insights = await _generate_insights(products, user_type)
+        insights = _generate_insights(products, user_type)
         
         report = TrendReport(
-            report_id=f"report_{datetime.utcnow().timestamp()}",
+            report_id=f"report_{time.time()}",
             user_type=user_type,
             top_trending=top_trending,
             emerging_trends=emerging_trends,
-            category_breakdown=category_breakdown,
+            category_breakdown=dict(category_breakdown),
             platform_analysis=platform_analysis,
             predictions=[],
             upcoming_events=[],
@@ -180,30 +205,30 @@ async def generate_trend_report(
 
 
 @router.get("/categories")
-async def get_trending_categories():
+@cached("trending_categories", should_cache=has_results)
+async def get_trending_categories(
+    aggregator: DataAggregator = Depends(get_aggregator)
+):
     """Get trending product categories"""
     try:
-        aggregator = DataAggregator()
-        
         products = await aggregator.aggregate_product_trends(
             keywords=["trending"],
             categories=[],
             days_back=7
         )
         
-        # Count by category
-        category_counts = {}
-        category_scores = {}
+        # Running [count, score_sum] per category
+        category_totals = defaultdict(lambda: [0, 0.0])
         
         for product in products:
-            cat = product.category
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-            category_scores[cat] = category_scores.get(cat, []) + [product.trend_score]
+            totals = category_totals[product.category]
+            totals[0] += 1
+            totals[1] += product.trend_score
         
         # Calculate average scores
         results = []
-        for category, count in category_counts.items():
-            avg_score = sum(category_scores[category]) / len(category_scores[category])
+        for category, (count, score_sum) in category_totals.items():
+            avg_score = score_sum / count
             results.append({
                 'category': category,
                 'product_count': count,
@@ -221,41 +246,50 @@ async def get_trending_categories():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def _generate_insights(products: List[Product], user_type: UserType) -> List[str]:
+def _generate_insights(products: List[Product], user_type: UserType) -> List[str]:
     """Generate insights based on user type"""
     insights = []
     
     if not products:
         return ["No trending products found in the specified criteria."]
     
+    # Gather all counts in a single pass
+    score_sum = 0.0
+    platform_counts = Counter()
+    emerging_count = 0
+    high_velocity_count = 0
+    peak_count = 0
+    
+    for product in products:
+        score_sum += product.trend_score
+        platform_counts.update(product.platforms)
+        if product.status == TrendStatus.EMERGING:
+            emerging_count += 1
+        elif product.status == TrendStatus.PEAK:
+            peak_count += 1
+        if product.viral_velocity > 0.7:
+            high_velocity_count += 1
+    
     # General insights
-    avg_score = sum(p.trend_score for p in products) / len(products)
+    avg_score = score_sum / len(products)
     insights.append(f"Average trend score across {len(products)} products: {avg_score:.2f}")
     
     # Platform insights
-    platform_counts = {}
-    for product in products:
-        for platform in product.platforms:
-            platform_counts[platform] = platform_counts.get(platform, 0) + 1
-    
-    top_platform = max(platform_counts.items(), key=lambda x: x[1])[0] if platform_counts else None
-    if top_platform:
-        insights.append(f"{top_platform.capitalize()} has the most trending products ({platform_counts[top_platform]} products)")
+    if platform_counts:
+        top_platform, top_count = platform_counts.most_common(1)[0]
+        insights.append(f"{top_platform.capitalize()} has the most trending products ({top_count} products)")
     
     # User-specific insights
     if user_type == UserType.MERCHANT:
-        emerging = [p for p in products if p.status == TrendStatus.EMERGING]
-        if emerging:
-            insights.append(f"{len(emerging)} emerging trends detected - opportunity for early positioning")
+        if emerging_count:
+            insights.append(f"{emerging_count} emerging trends detected - opportunity for early positioning")
         
-        high_velocity = [p for p in products if p.viral_velocity > 0.7]
-        if high_velocity:
-            insights.append(f"{len(high_velocity)} products showing high viral velocity - act quickly")
+        if high_velocity_count:
+            insights.append(f"{high_velocity_count} products showing high viral velocity - act quickly")
     
     else:  # Consumer
-        peak_products = [p for p in products if p.status == TrendStatus.PEAK]
-        if peak_products:
-            insights.append(f"{len(peak_products)} products at peak popularity - high social proof")
+        if peak_count:
+            insights.append(f"{peak_count} products at peak popularity - high social proof")
         
         insights.append("Check product comparisons for best deals across platforms")
     
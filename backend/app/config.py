@@ -4,14 +4,23 @@ Configuration management for Shopping Trend Radar Agent
 """
 
 import os
-from typing import Optional
-from pydantic_settings import BaseSettings
+from types import MappingProxyType
+from typing import List, Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        extra="ignore",
+        frozen=True
+    )
+    
     # Application
     APP_NAME: str = "Shopping Trend Radar Agent"
     APP_VERSION: str = "1.0.0"
@@ -32,14 +41,20 @@ class Settings(BaseSettings):
     BEDROCK_AGENT_ID: str = ""
     BEDROCK_AGENT_ALIAS_ID: str = ""
     BEDROCK_MODEL_ID: str = "anthropic.claude-3-sonnet-20240229-v1:0"
+    BEDROCK_INFERENCE_PROFILE_ARN: Optional[str] = None  # Used instead of BEDROCK_MODEL_ID when set
+    BEDROCK_PROMPT_CACHING: bool = False  # Requires a model with prompt caching support
+    BEDROCK_MAX_CONCURRENCY: int = 16
+    BEDROCK_BATCH_ROLE_ARN: str = ""
     
     # SageMaker
     SAGEMAKER_ENDPOINT_NAME: str = "trend-prediction-endpoint"
     SAGEMAKER_EXECUTION_ROLE: str = ""
+    SAGEMAKER_MAX_CONCURRENCY: int = 16  # Concurrent endpoint invocations
     
     # Nova SDK
     NOVA_API_KEY: str = ""
     NOVA_API_URL: str = "https://api.nova.ai/v1"
+    NOVA_MAX_CONCURRENCY: int = 16  # Concurrent social media API requests per aggregation
     
     # Amazon Q
     AMAZON_Q_APP_ID: str = ""
@@ -48,6 +63,7 @@ class Settings(BaseSettings):
     # Strands SDK
     STRANDS_API_KEY: str = ""
     STRANDS_WORKSPACE_ID: str = ""
+    INGESTION_TIMEOUT: float = 15.0  # Seconds to wait for each sales platform
     
     # S3
     S3_BUCKET_NAME: str = "shopping-trend-radar-data"
@@ -78,6 +94,14 @@ class Settings(BaseSettings):
     # Cache
     CACHE_TTL: int = 3600  # 1 hour
     TREND_CACHE_TTL: int = 1800  # 30 minutes
+    RESPONSE_CACHE_TTL: int = 120  # 2 minutes
+    AGGREGATION_CACHE_TTL: int = 60  # 1 minute
+    BEDROCK_CACHE_TTL: int = 1800  # 30 minutes
+    BEDROCK_PREDICTION_CACHE_TTL: int = 21600  # 6 hours
+    BEDROCK_CONSUMER_CACHE_TTL: int = 600  # 10 minutes
+    SAGEMAKER_PREDICTION_CACHE_TTL: int = 900  # 15 minutes
+    PAGE_CACHE_MAX_AGE: int = 60  # 1 minute
+    STATIC_CACHE_MAX_AGE: int = 86400  # 1 day
     
     # Monitoring
     LOG_LEVEL: str = "INFO"
@@ -93,7 +117,9 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # CORS
-    CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8000"]
+    CORS_ORIGINS: List[str] = Field(
+        default_factory=lambda: ["http://localhost:3000", "http://localhost:8000"]
+    )
     
     # Trend Analysis
     TREND_SCORE_THRESHOLD: float = 0.7
@@ -107,10 +133,6 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
 
 
 @lru_cache()
@@ -120,7 +142,7 @@ def get_settings() -> Settings:
 
 
 # Platform configuration
-SUPPORTED_PLATFORMS = {
+SUPPORTED_PLATFORMS = MappingProxyType({
     "amazon": {
         "name": "Amazon",
         "api_endpoint": "https://webservices.amazon.com/paapi5",
@@ -181,18 +203,27 @@ SUPPORTED_PLATFORMS = {
         "weight": 0.01,
         "metrics": ["ratings", "reviews", "stock_status"]
     }
-}
+})
+
+# Precomputed platform lookups
+PLATFORM_IDS = tuple(SUPPORTED_PLATFORMS)
+PLATFORM_INDEX = MappingProxyType({platform: i for i, platform in enumerate(PLATFORM_IDS)})
+PLATFORM_WEIGHTS = tuple(config["weight"] for config in SUPPORTED_PLATFORMS.values())
+PLATFORM_WEIGHT_BY_ID = MappingProxyType(dict(zip(PLATFORM_IDS, PLATFORM_WEIGHTS)))
+PLATFORM_METRICS = MappingProxyType({
+    platform: frozenset(config["metrics"]) for platform, config in SUPPORTED_PLATFORMS.items()
+})
 
 # Category configuration
-PRODUCT_CATEGORIES = [
+PRODUCT_CATEGORIES = (
     "Electronics", "Fashion", "Beauty", "Home & Garden", 
     "Sports & Outdoors", "Toys & Games", "Health & Wellness",
     "Food & Beverage", "Pet Supplies", "Books & Media",
     "Automotive", "Office Supplies", "Baby & Kids"
-]
+)
 
 # Event calendar
-CALENDAR_EVENTS = {
+CALENDAR_EVENTS = MappingProxyType({
     "01-01": {"name": "New Year's Day", "categories": ["Party Supplies", "Home Decor"]},
     "02-14": {"name": "Valentine's Day", "categories": ["Gifts", "Jewelry", "Flowers"]},
     "03-17": {"name": "St. Patrick's Day", "categories": ["Party Supplies", "Apparel"]},
@@ -204,4 +235,10 @@ CALENDAR_EVENTS = {
     "11-29": {"name": "Black Friday", "categories": ["All"]},
     "12-02": {"name": "Cyber Monday", "categories": ["Electronics", "Fashion"]},
     "12-25": {"name": "Christmas", "categories": ["Gifts", "Decorations", "Toys"]},
-}
+})
+
+# Calendar events keyed by month * 100 + day
+CALENDAR_BY_ORDINAL = MappingProxyType({
+    int(date_str[:2]) * 100 + int(date_str[3:]): event_info
+    for date_str, event_info in CALENDAR_EVENTS.items()
+})
@@ -5,24 +5,30 @@ Main FastAPI application
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 import time
+import asyncio
+import contextlib
 from app.config import get_settings
 from app.api import trends, products, alerts
+from app.api.dependencies import get_aggregator, get_alert_evaluator
 from app.utils.logger import get_logger
-from app.utils.metrics import MetricsCollector
+from app.utils.metrics import get_metrics_collector
+from app.utils.cache import close_redis
 
 settings = get_settings()
 logger = get_logger(__name__)
-metrics = MetricsCollector()
+metrics = get_metrics_collector()
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="AI-powered shopping trend analysis across multiple platforms"
+    description="AI-powered shopping trend analysis across multiple platforms",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -35,17 +41,23 @@ app.add_middleware(
 )
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
-
-# Templates
-templates = Jinja2Templates(directory="frontend/templates")
+app.mount("/static", StaticFiles(directory="frontend/static", check_dir=False), name="static")
+STATIC_CACHE_CONTROL = f"public, max-age={settings.STATIC_CACHE_MAX_AGE}"
+
+# Templates (compiled once; only re-checked on disk in debug mode)
+templates = Jinja2Templates(
+    directory="frontend/templates",
+    auto_reload=settings.DEBUG,
+    bytecode_cache=FileSystemBytecodeCache()
+)
+PAGE_CACHE_HEADERS = {"Cache-Control": f"public, max-age={settings.PAGE_CACHE_MAX_AGE}"}
 
 # Middleware for metrics
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     response = await call_next(request)
-    process_time = (time.time() - start_time) * 1000  # Convert to ms
+    process_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to ms
     
     # Record metrics
     metrics.record_api_call(
@@ -57,18 +69,41 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+# Let browsers and CDNs cache static assets
+@app.middleware("http")
+async def add_static_cache_header(request: Request, call_next):
+    response = await call_next(request)
+    if request.url.path.startswith("/static/") and response.status_code == 200:
+        response.headers["Cache-Control"] = STATIC_CACHE_CONTROL
+    return response
+
 # Exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Global exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    logger.error("Global exception: %s", exc, exc_info=True)
+    detail = str(exc) if settings.DEBUG else "An error occurred"
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "error": "Internal server error",
-            "detail": str(exc) if settings.DEBUG else "An error occurred"
-        }
+        content={"error": "Internal server error", "detail": detail}
     )
 
+# Background alert evaluation and metrics flushing
+@app.on_event("startup")
+async def startup():
+    app.state.alert_task = asyncio.create_task(get_alert_evaluator().run())
+    app.state.metrics_task = asyncio.create_task(metrics.run_flush_loop())
+
+# Shutdown hook
+@app.on_event("shutdown")
+async def shutdown():
+    for task in (app.state.alert_task, app.state.metrics_task):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if get_aggregator.cache_info().currsize:
+        await get_aggregator().close()
+    await close_redis()
+
 # Include routers
 app.include_router(trends.router, prefix=settings.API_V1_PREFIX)
 app.include_router(products.router, prefix=settings.API_V1_PREFIX)
@@ -78,22 +113,22 @@ app.include_router(alerts.router, prefix=settings.API_V1_PREFIX)
 @app.get("/")
 async def home(request: Request):
     """Home page"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse("index.html", {"request": request}, headers=PAGE_CACHE_HEADERS)
 
 @app.get("/merchant")
 async def merchant_dashboard(request: Request):
     """Merchant dashboard"""
-    return templates.TemplateResponse("merchant_dashboard.html", {"request": request})
+    return templates.TemplateResponse("merchant_dashboard.html", {"request": request}, headers=PAGE_CACHE_HEADERS)
 
 @app.get("/consumer")
 async def consumer_dashboard(request: Request):
     """Consumer dashboard"""
-    return templates.TemplateResponse("consumer_dashboard.html", {"request": request})
+    return templates.TemplateResponse("consumer_dashboard.html", {"request": request}, headers=PAGE_CACHE_HEADERS)
 
 @app.get("/demo")
 async def demo(request: Request):
     """Interactive demo"""
-    return templates.TemplateResponse("demo.html", {"request": request})
+    return templates.TemplateResponse("demo.html", {"request": request}, headers=PAGE_CACHE_HEADERS)
 
 # Health check
 @app.get("/health")
@@ -127,5 +162,7 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        workers=settings.WORKERS
+        workers=settings.WORKERS,
+        loop="uvloop",
+        http="httptools"
     )
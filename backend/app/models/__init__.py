@@ -1,35 +1,37 @@
 """
 backend/app/models/__init__.py
 Data models package
+
+Models are imported lazily on first access.
 """
 
-from .trends import (
-    Product,
-    TrendStatus,
-    UserType,
-    PlatformMetrics,
-    TrendPrediction,
-    ProductComparison,
-    Alert,
-    EventRecommendation,
-    TrendReport,
-    MerchantInsight,
-    ConsumerInsight
-)
-from .users import User, UserPreferences
+import importlib
+
+_LAZY = {
+    "Product": "trends",
+    "TrendStatus": "trends",
+    "UserType": "trends",
+    "PlatformMetrics": "trends",
+    "TrendPrediction": "trends",
+    "ProductComparison": "trends",
+    "Alert": "trends",
+    "EventRecommendation": "trends",
+    "TrendReport": "trends",
+    "MerchantInsight": "trends",
+    "ConsumerInsight": "trends",
+    "User": "users",
+    "UserPreferences": "users",
+    "USER_ADAPTER": "users",
+    "USER_PREFERENCES_ADAPTER": "users"
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    "Product",
-    "TrendStatus",
-    "UserType",
-    "PlatformMetrics",
-    "TrendPrediction",
-    "ProductComparison",
-    "Alert",
-    "EventRecommendation",
-    "TrendReport",
-    "MerchantInsight",
-    "ConsumerInsight",
-    "User",
-    "UserPreferences"
-]
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -4,8 +4,8 @@ User-related data models
 """
 
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, Tuple
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 from enum import Enum
 
 
@@ -17,6 +17,8 @@ class UserRole(str, Enum):
 
 class User(BaseModel):
     """User model"""
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     email: EmailStr
     username: str
@@ -29,10 +31,18 @@ class User(BaseModel):
 
 class UserPreferences(BaseModel):
     """User preferences and settings"""
+    model_config = ConfigDict(frozen=True)
+    
     user_id: str
-    favorite_categories: List[str] = []
-    preferred_platforms: List[str] = []
+    # Tuples keep frozen instances hashable
+    favorite_categories: Tuple[str, ...] = ()
+    preferred_platforms: Tuple[str, ...] = ()
     notification_enabled: bool = True
     email_alerts: bool = True
     price_alert_threshold: float = 0.1  # 10% price change
     min_trend_score: float = 0.7
+
+
+# Validators built once, for validating raw payloads
+USER_ADAPTER = TypeAdapter(User)
+USER_PREFERENCES_ADAPTER = TypeAdapter(UserPreferences)
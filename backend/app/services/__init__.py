@@ -1,20 +1,31 @@
 """
 backend/app/services/__init__.py
 Services package
+
+Services are imported lazily on first access, so importing one service
+does not load boto3 clients and settings for all of them.
 """
 
-from .bedrock_agent import BedrockAgentService
-from .sagemaker_predictor import SageMakerPredictor
-from .nova_connector import NovaConnector
-from .strands_ingestion import StrandsIngestionService
-from .amazon_q_service import AmazonQService
-from .data_aggregator import DataAggregator
+import importlib
+
+_LAZY = {
+    "BedrockAgentService": "bedrock_agent",
+    "SageMakerPredictor": "sagemaker_predictor",
+    "NovaConnector": "nova_connector",
+    "StrandsIngestionService": "strands_ingestion",
+    "AmazonQService": "amazon_q_service",
+    "DataAggregator": "data_aggregator",
+    "AlertStore": "alert_store",
+    "AlertEvaluator": "alert_evaluator"
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    "BedrockAgentService",
-    "SageMakerPredictor",
-    "NovaConnector",
-    "StrandsIngestionService",
-    "AmazonQService",
-    "DataAggregator"
-]
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
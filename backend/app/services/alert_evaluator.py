@@ -0,0 +1,106 @@
+"""
+backend/app/services/alert_evaluator.py
+Periodic evaluation of user trend alerts
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+from app.config import get_settings
+from app.models.trends import Alert, Product
+from app.services.alert_store import AlertStore
+from app.services.data_aggregator import DataAggregator
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class AlertEvaluator:
+    """Evaluates all active alerts on a schedule and stores their results"""
+
+    LOCK_NAME = "alert_evaluation"
+
+    def __init__(self, aggregator: DataAggregator, store: AlertStore):
+        self.aggregator = aggregator
+        self.store = store
+        self.interval = settings.ALERT_CHECK_INTERVAL
+
+    async def run(self):
+        """Evaluate alerts every interval until cancelled"""
+        while True:
+            try:
+                # Only one worker evaluates per interval
+                if await self.store.acquire_lock(self.LOCK_NAME, self.interval):
+                    await self.evaluate_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error evaluating alerts: {str(e)}")
+
+            await asyncio.sleep(self.interval)
+
+    async def evaluate_all(self) -> int:
+        """Evaluate every active alert, aggregating once per distinct search"""
+        alerts = [alert for alert in await self.store.get_all() if alert.active]
+
+        # Alerts searching the same keywords and categories share one aggregation
+        groups = defaultdict(list)
+        for alert in alerts:
+            groups[(tuple(sorted(alert.keywords)), tuple(sorted(alert.categories)))].append(alert)
+
+        for (keywords, categories), group in groups.items():
+            products = await self._fetch_candidates(list(keywords), list(categories), group)
+
+            for alert in group:
+                await self._save_result(alert, self._match(alert, products))
+
+        logger.info(f"Evaluated {len(alerts)} alerts in {len(groups)} aggregations")
+        return len(alerts)
+
+    async def evaluate(self, alert: Alert) -> Dict:
+        """Evaluate a single alert immediately"""
+        products = await self._fetch_candidates(alert.keywords, alert.categories, [alert])
+        return await self._save_result(alert, self._match(alert, products))
+
+    async def _fetch_candidates(
+        self,
+        keywords: List[str],
+        categories: List[str],
+        alerts: List[Alert]
+    ) -> List[Product]:
+        """Aggregate products loose enough to cover every alert in the group"""
+        platforms = None
+        if all(alert.platforms for alert in alerts):
+            platforms = sorted({pl for alert in alerts for pl in alert.platforms})
+
+        return await self.aggregator.aggregate_product_trends(
+            keywords=keywords,
+            categories=categories,
+            days_back=1,
+            min_trend_score=min(alert.min_trend_score for alert in alerts),
+            platforms=platforms
+        )
+
+    def _match(self, alert: Alert, products: List[Product]) -> List[Product]:
+        """Filter products by an alert's own criteria"""
+        alert_platforms = frozenset(alert.platforms)
+        return [
+            p for p in products
+            if p.trend_score >= alert.min_trend_score
+            and (not alert_platforms or not alert_platforms.isdisjoint(p.platforms))
+        ]
+
+    async def _save_result(self, alert: Alert, matching_products: List[Product]) -> Dict:
+        """Store and return an alert's evaluation result"""
+        state = {
+            "alert_id": alert.id,
+            "triggered": len(matching_products) > 0,
+            "matching_products": [p.model_dump(mode="json") for p in matching_products[:5]],
+            "checked_at": datetime.utcnow().isoformat()
+        }
+
+        # Keep results across one missed run
+        await self.store.save_state(alert.id, state, self.interval * 2)
+        return state
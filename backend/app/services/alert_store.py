@@ -0,0 +1,87 @@
+"""
+backend/app/services/alert_store.py
+Redis-backed persistence for user trend alerts
+"""
+
+import json
+import redis.asyncio as redis
+from typing import Dict, List, Optional
+from app.models.trends import Alert
+from app.utils.cache import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AlertStore:
+    """Stores alerts as JSON under alert:{id} with a user_alerts:{user_id} index set"""
+
+    ALL_ALERTS_KEY = "alerts:all"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        # Defaults to the shared client; tests pass their own
+        self.redis = redis_client or get_redis()
+
+    @staticmethod
+    def _alert_key(alert_id: str) -> str:
+        return f"alert:{alert_id}"
+
+    @staticmethod
+    def _user_key(user_id: str) -> str:
+        return f"user_alerts:{user_id}"
+
+    @staticmethod
+    def _state_key(alert_id: str) -> str:
+        return f"alert_state:{alert_id}"
+
+    async def get(self, alert_id: str) -> Optional[Alert]:
+        """Get an alert by ID"""
+        data = await self.redis.get(self._alert_key(alert_id))
+        return Alert.model_validate_json(data) if data is not None else None
+
+    async def save(self, alert: Alert):
+        """Create or replace an alert, discarding any stale evaluation result"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._alert_key(alert.id), alert.model_dump_json())
+            pipe.delete(self._state_key(alert.id))
+            pipe.sadd(self._user_key(alert.user_id), alert.id)
+            pipe.sadd(self.ALL_ALERTS_KEY, alert.id)
+            await pipe.execute()
+
+    async def delete(self, alert: Alert):
+        """Delete an alert and remove it from its user's index"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._alert_key(alert.id))
+            pipe.srem(self._user_key(alert.user_id), alert.id)
+            pipe.srem(self.ALL_ALERTS_KEY, alert.id)
+            pipe.delete(self._state_key(alert.id))
+            await pipe.execute()
+
+    async def get_user_alerts(self, user_id: str) -> List[Alert]:
+        """Get all alerts for a user"""
+        return await self._get_many(await self.redis.smembers(self._user_key(user_id)))
+
+    async def get_all(self) -> List[Alert]:
+        """Get every stored alert"""
+        return await self._get_many(await self.redis.smembers(self.ALL_ALERTS_KEY))
+
+    async def get_state(self, alert_id: str) -> Optional[Dict]:
+        """Get the last evaluation result for an alert"""
+        data = await self.redis.get(self._state_key(alert_id))
+        return json.loads(data) if data is not None else None
+
+    async def save_state(self, alert_id: str, state: Dict, expire: int):
+        """Store an alert evaluation result with a TTL in seconds"""
+        await self.redis.set(self._state_key(alert_id), json.dumps(state), ex=expire)
+
+    async def acquire_lock(self, name: str, expire: int) -> bool:
+        """Acquire a lock shared by all workers until it expires"""
+        return bool(await self.redis.set(f"lock:{name}", "1", nx=True, ex=expire))
+
+    async def _get_many(self, alert_ids) -> List[Alert]:
+        """Load alerts by ID, skipping any that no longer exist"""
+        if not alert_ids:
+            return []
+
+        values = await self.redis.mget([self._alert_key(a) for a in alert_ids])
+        return [Alert.model_validate_json(v) for v in values if v is not None]
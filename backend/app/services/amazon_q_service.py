@@ -3,28 +3,97 @@ backend/app/services/amazon_q_service.py
 Amazon Q integration for policy and metadata queries
 """
 
+import asyncio
+import re
 import boto3
 import json
+from botocore.config import Config
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional
 from app.config import get_settings
 from app.utils.logger import get_logger
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+@lru_cache()
+def _q_client():
+    """Get the process-wide Amazon Q client with a pooled keep-alive connection"""
+    return boto3.client(
+        'qbusiness',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=Config(
+            max_pool_connections=50,
+            tcp_keepalive=True,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        )
+    )
+
+
+def _keyword_pattern(*keywords: str) -> re.Pattern:
+    """Compile a case-insensitive pattern matching any of the keywords"""
+    return re.compile('|'.join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+# Line classifiers for Amazon Q responses
+POLICY_PATTERN = _keyword_pattern('policy', 'requirement', 'must', 'required')
+RESTRICTION_PATTERN = _keyword_pattern('restrict', 'prohibit', 'not allow', 'forbidden')
+COMPLIANCE_PATTERN = _keyword_pattern('comply', 'compliance', 'regulation', 'standard')
+RECOMMENDATION_PATTERN = _keyword_pattern('recommend', 'suggest', 'should', 'consider')
+ISSUE_PATTERN = _keyword_pattern('issue', 'problem', 'violation', 'concern')
+
+# Compliance terms, found in a single scan of each response
+NON_COMPLIANT_TERMS = frozenset({'not compliant', 'violates', 'prohibited', 'restricted'})
+COMPLIANT_TERMS = frozenset({'compliant', 'allowed'})
+COMPLIANCE_PLATFORMS = ('amazon', 'ebay', 'walmart', 'etsy', 'target')
+# Matched in a lookahead so overlapping terms ('compliant' inside 'not compliant',
+# 'target' and 'etsy' in 'targetsy') are all found, like substring checks.
+# No term is a prefix of another, so one match per position is enough.
+TERM_PATTERN = re.compile(
+    f"(?=({_keyword_pattern(*sorted(NON_COMPLIANT_TERMS | COMPLIANT_TERMS), *COMPLIANCE_PLATFORMS).pattern}))",
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _ParsedQ:
+    """Amazon Q system message, split and scanned for terms once per response"""
+    raw: str
+    lines: List[str]
+    terms: frozenset
+
+
+def _parse_response(response: Dict) -> _ParsedQ:
+    """Parse the system message out of a chat_sync response"""
+    system_message = response.get('systemMessage', '')
+    return _ParsedQ(
+        raw=system_message,
+        lines=system_message.splitlines(),
+        terms=frozenset(TERM_PATTERN.findall(system_message.lower()))
+    )
+
+
+def _matching_lines(parsed: _ParsedQ, pattern: re.Pattern) -> List[str]:
+    """Return stripped message lines that match pattern"""
+    return [line.strip() for line in parsed.lines if pattern.search(line)]
+
+
 class AmazonQService:
     """Service for Amazon Q business intelligence queries"""
     
+    # Max number of cached query responses
+    CACHE_SIZE = 1024
+    
     def __init__(self):
-        self.q_client = boto3.client(
-            'qbusiness',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        self.q_client = _q_client()
         self.app_id = settings.AMAZON_Q_APP_ID
         self.user_id = settings.AMAZON_Q_USER_ID
+        self._response_cache = TTLCache(self.CACHE_SIZE, settings.TREND_CACHE_TTL)
     
     async def query_product_policy(
         self,
@@ -35,18 +104,14 @@ class AmazonQService:
         try:
             query = f"What are the listing policies and restrictions for {product_category} products on {platform}?"
             
-            response = self.q_client.chat_sync(
-                applicationId=self.app_id,
-                userId=self.user_id,
-                userMessage=query
-            )
+            parsed = await self._chat(query)
             
             return {
                 'category': product_category,
                 'platform': platform,
-                'policies': self._parse_policy_response(response),
-                'restrictions': self._extract_restrictions(response),
-                'compliance_notes': self._extract_compliance(response)
+                'policies': self._parse_policy_response(parsed),
+                'restrictions': self._extract_restrictions(parsed),
+                'compliance_notes': self._extract_compliance(parsed)
             }
         
         except Exception as e:
@@ -61,13 +126,9 @@ class AmazonQService:
         try:
             query = f"Provide detailed metadata and attributes for product ID: {product_id}"
             
-            response = self.q_client.chat_sync(
-                applicationId=self.app_id,
-                userId=self.user_id,
-                userMessage=query
-            )
+            parsed = await self._chat(query)
             
-            return self._parse_metadata_response(response)
+            return self._parse_metadata_response(parsed)
         
         except Exception as e:
             logger.error(f"Amazon Q metadata query error: {str(e)}")
@@ -81,17 +142,13 @@ class AmazonQService:
         try:
             query = f"Provide market insights, trends, and key metrics for {category} category"
             
-            response = self.q_client.chat_sync(
-                applicationId=self.app_id,
-                userId=self.user_id,
-                userMessage=query
-            )
+            parsed = await self._chat(query)
             
             return {
                 'category': category,
-                'insights': self._parse_insights(response),
-                'key_metrics': self._extract_metrics(response),
-                'recommendations': self._extract_recommendations(response)
+                'insights': self._parse_insights(parsed),
+                'key_metrics': self._extract_metrics(parsed),
+                'recommendations': self._extract_recommendations(parsed)
             }
         
         except Exception as e:
@@ -113,91 +170,69 @@ class AmazonQService:
             Verify compliance for Amazon, eBay, Walmart, Etsy, and Target.
             """
             
-            response = self.q_client.chat_sync(
-                applicationId=self.app_id,
-                userId=self.user_id,
-                userMessage=query
-            )
+            parsed = await self._chat(query)
             
             return {
                 'product_id': product_data.get('id'),
-                'compliant': self._check_compliance(response),
-                'platform_status': self._parse_platform_compliance(response),
-                'issues': self._extract_compliance_issues(response),
-                'recommendations': self._extract_recommendations(response)
+                'compliant': self._check_compliance(parsed),
+                'platform_status': self._parse_platform_compliance(parsed),
+                'issues': self._extract_compliance_issues(parsed),
+                'recommendations': self._extract_recommendations(parsed)
             }
         
         except Exception as e:
             logger.error(f"Amazon Q compliance check error: {str(e)}")
             return {'error': str(e)}
     
-    def _parse_policy_response(self, response: Dict) -> List[str]:
+    async def _chat(self, query: str) -> _ParsedQ:
+        """Send a query to Amazon Q, reusing recent answers to identical queries"""
+        return await self._response_cache.get_or_fetch(query, lambda: self._fetch_chat(query))
+    
+    async def _fetch_chat(self, query: str) -> _ParsedQ:
+        """Run a blocking chat_sync call in a worker thread and parse the response"""
+        response = await asyncio.to_thread(
+            self.q_client.chat_sync,
+            applicationId=self.app_id,
+            userId=self.user_id,
+            userMessage=query
+        )
+        return _parse_response(response)
+    
+    def _parse_policy_response(self, parsed: _ParsedQ) -> List[str]:
         """Parse policy information from Q response"""
-        system_message = response.get('systemMessage', '')
-        
-        # Extract policy points
-        policies = []
-        lines = system_message.split('\n')
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['policy', 'requirement', 'must', 'required']):
-                policies.append(line.strip())
-        
-        return policies
+        return _matching_lines(parsed, POLICY_PATTERN)
     
-    def _extract_restrictions(self, response: Dict) -> List[str]:
+    def _extract_restrictions(self, parsed: _ParsedQ) -> List[str]:
         """Extract restrictions from response"""
-        system_message = response.get('systemMessage', '')
-        
-        restrictions = []
-        lines = system_message.split('\n')
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['restrict', 'prohibit', 'not allow', 'forbidden']):
-                restrictions.append(line.strip())
-        
-        return restrictions
+        return _matching_lines(parsed, RESTRICTION_PATTERN)
     
-    def _extract_compliance(self, response: Dict) -> List[str]:
+    def _extract_compliance(self, parsed: _ParsedQ) -> List[str]:
         """Extract compliance notes"""
-        system_message = response.get('systemMessage', '')
-        
-        compliance = []
-        lines = system_message.split('\n')
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['comply', 'compliance', 'regulation', 'standard']):
-                compliance.append(line.strip())
-        
-        return compliance
+        return _matching_lines(parsed, COMPLIANCE_PATTERN)
     
-    def _parse_metadata_response(self, response: Dict) -> Dict:
+    def _parse_metadata_response(self, parsed: _ParsedQ) -> Dict:
         """Parse metadata from response"""
-        system_message = response.get('systemMessage', '')
-        
         # Basic parsing - in production, use more sophisticated NLP
         metadata = {
-            'description': system_message,
+            'description': parsed.raw,
             'attributes': {},
             'specifications': []
         }
         
         return metadata
     
-    def _parse_insights(self, response: Dict) -> List[str]:
+    def _parse_insights(self, parsed: _ParsedQ) -> List[str]:
         """Parse insights from response"""
-        system_message = response.get('systemMessage', '')
-        
         insights = []
-        lines = system_message.split('\n')
         
-        for line in lines:
-            if line.strip() and len(line.strip()) > 20:
-                insights.append(line.strip())
+        for line in parsed.lines:
+            line = line.strip()
+            if len(line) > 20:
+                insights.append(line)
         
         return insights
     
-    def _extract_metrics(self, response: Dict) -> Dict:
+    def _extract_metrics(self, parsed: _ParsedQ) -> Dict:
         """Extract metrics from response"""
         # Placeholder - implement metric extraction logic
         return {
@@ -206,58 +241,26 @@ class AmazonQService:
             'competition_level': 'Unknown'
         }
     
-    def _extract_recommendations(self, response: Dict) -> List[str]:
+    def _extract_recommendations(self, parsed: _ParsedQ) -> List[str]:
         """Extract recommendations from response"""
-        system_message = response.get('systemMessage', '')
-        
-        recommendations = []
-        lines = system_message.split('\n')
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['recommend', 'suggest', 'should', 'consider']):
-                recommendations.append(line.strip())
-        
-        return recommendations
+        return _matching_lines(parsed, RECOMMENDATION_PATTERN)
     
-    def _check_compliance(self, response: Dict) -> bool:
+    def _check_compliance(self, parsed: _ParsedQ) -> bool:
         """Check if product is compliant"""
-        system_message = response.get('systemMessage', '').lower()
-        
         # Check for non-compliance indicators
-        non_compliant_keywords = ['not compliant', 'violates', 'prohibited', 'restricted']
-        
-        for keyword in non_compliant_keywords:
-            if keyword in system_message:
-                return False
-        
-        return True
+        return NON_COMPLIANT_TERMS.isdisjoint(parsed.terms)
     
-    def _parse_platform_compliance(self, response: Dict) -> Dict[str, bool]:
+    def _parse_platform_compliance(self, parsed: _ParsedQ) -> Dict[str, bool]:
         """Parse compliance status per platform"""
-        system_message = response.get('systemMessage', '').lower()
-        
-        platforms = ['amazon', 'ebay', 'walmart', 'etsy', 'target']
-        status = {}
-        
-        for platform in platforms:
-            if platform in system_message:
-                # Check for compliance indicators
-                compliant = 'compliant' in system_message or 'allowed' in system_message
-                status[platform] = compliant
-            else:
-                status[platform] = True  # Default to compliant if not mentioned
+        # Check for compliance indicators
+        compliant = not COMPLIANT_TERMS.isdisjoint(parsed.terms)
         
-        return status
+        # Default to compliant if not mentioned
+        return {
+            platform: compliant if platform in parsed.terms else True
+            for platform in COMPLIANCE_PLATFORMS
+        }
     
-    def _extract_compliance_issues(self, response: Dict) -> List[str]:
+    def _extract_compliance_issues(self, parsed: _ParsedQ) -> List[str]:
         """Extract compliance issues"""
-        system_message = response.get('systemMessage', '')
-        
-        issues = []
-        lines = system_message.split('\n')
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['issue', 'problem', 'violation', 'concern']):
-                issues.append(line.strip())
-        
-        return issues
+        return _matching_lines(parsed, ISSUE_PATTERN)
@@ -3,33 +3,343 @@ backend/app/services/bedrock_agent.py
 AWS Bedrock Agent integration for trend analysis
 """
 
-import json
+import re
+import time
+import uuid
+import asyncio
 import boto3
-from typing import Dict, List, Optional
+import hashlib
+import threading
+import orjson
+from dataclasses import dataclass
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+from botocore.config import Config
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional
 from datetime import datetime
 from app.config import get_settings
 from app.utils.logger import get_logger
+from app.utils.cache import CACHE_PREFIX, get_raw, set_raw, tag_keys, invalidate_tag
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Foundation model ID or inference profile ARN, passed verbatim as modelId.
+# Inference profiles allow cross-region routing and higher sustained throughput.
+_MODEL_ID = settings.BEDROCK_INFERENCE_PROFILE_ARN or settings.BEDROCK_MODEL_ID
+
+# Pooled keep-alive connections shared by all concurrent Bedrock calls
+_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=60,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+
+
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(service_name: str):
+    """
+    Get the process-wide client for an AWS service, creating it on first use
+    
+    botocore clients are thread-safe, so one instance serves every request.
+    Creation is locked since first use may come from several worker threads.
+    """
+    client = _clients.get(service_name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(service_name)
+            if client is None:
+                client = _clients[service_name] = boto3.client(
+                    service_name,
+                    region_name=settings.AWS_REGION,
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    config=_CLIENT_CONFIG
+                )
+    return client
+
+# Static instructions, sent as the system prompt ahead of per-request data.
+# Kept byte-identical across calls so Bedrock can reuse the cached prefix.
+_ANALYSIS_SYSTEM = """Analyze the product's trending status across multiple platforms.
+
+Calculate and provide:
+1. Overall trend score (0-1, where 1 is highest trending)
+2. Viral velocity (rate of growth, 0-1)
+3. Trend status (emerging/rising/peak/declining/stable)
+4. Platform-specific insights
+5. Competitive analysis
+6. Key factors driving the trend
+
+Provide response as JSON with these exact keys:
+{
+    "trend_score": 0.0-1.0,
+    "viral_velocity": 0.0-1.0,
+    "status": "emerging|rising|peak|declining|stable",
+    "platform_insights": {"platform_name": "insight"},
+    "competitive_analysis": "string",
+    "key_factors": ["factor1", "factor2"],
+    "confidence": 0.0-1.0
+}
+
+Reply with only the JSON in a ```json code block."""
+
+_PREDICTION_SYSTEM = """Analyze the product trend data and predict its trajectory.
+
+Provide:
+1. Predicted peak date (format: YYYY-MM-DD)
+2. Confidence score (0-1)
+3. Estimated duration in days
+4. Key factors influencing the trend
+5. Recommendation (buy now, wait, avoid)
+
+Format as JSON with these exact keys:
+{
+    "predicted_peak_date": "YYYY-MM-DD or null",
+    "confidence_score": 0.0-1.0,
+    "duration_days": integer or null,
+    "factors": {"factor_name": importance_score},
+    "recommendation": "string"
+}
+
+Reply with only the JSON in a ```json code block."""
+
+_MERCHANT_SYSTEM = """As a business intelligence analyst, analyze the product opportunity.
+
+Provide merchant-specific insights:
+1. Sourcing recommendations (suppliers, costs, MOQ)
+2. Profit margin estimates
+3. Inventory recommendations (how many units to stock)
+4. Target market segments
+5. Marketing strategy suggestions
+6. Risk factors to consider
+
+Format as JSON.
+
+Reply with only the JSON in a ```json code block."""
+
+_CONSUMER_SYSTEM = """As a shopping advisor, analyze the product for consumers.
+
+Provide consumer-specific insights:
+1. Is this a good time to buy? (yes/no with reasoning)
+2. Price trend analysis (rising/falling/stable)
+3. Value assessment (good value/overpriced/fair)
+4. Alternative recommendations
+5. Best platform to purchase from
+6. Gift suitability (occasions, age groups)
+
+Format as JSON.
+
+Reply with only the JSON in a ```json code block."""
+
+_PLATFORM_SYSTEM = """Analyze cross-platform trend patterns.
+
+Identify:
+1. Which platforms show strongest trends
+2. Platform-specific patterns (e.g., TikTok viral vs Amazon sales)
+3. Cross-platform correlation insights
+4. Emerging vs declining platforms for this trend
+5. Recommended platform focus for merchants
+
+Format as JSON with actionable insights.
+
+Reply with only the JSON in a ```json code block."""
+
+# Tag sets must outlive every completion or response cached under them
+PRODUCT_TAG_TTL = max(
+    settings.RESPONSE_CACHE_TTL,
+    settings.BEDROCK_CACHE_TTL,
+    settings.BEDROCK_PREDICTION_CACHE_TTL,
+    settings.BEDROCK_CONSUMER_CACHE_TTL
+)
+
+# Response token budgets, sized to each method's JSON output
+_ANALYSIS_MAX_TOKENS = 600
+_PREDICTION_MAX_TOKENS = 400
+_MERCHANT_MAX_TOKENS = 800
+_CONSUMER_MAX_TOKENS = 600
+_PLATFORM_MAX_TOKENS = 800
+
+# Stop generating once the JSON code block is closed
+_STOP_SEQUENCES = ["```\n"]
+
+# First fenced code block in a completion, with or without a json tag. The
+# closing fence is optional since the stop sequence drops it.
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.S)
+
+# Per-request data, appended after the static instructions
+_ANALYSIS_TEMPLATE = """Product: {name}
+Category: {category}
+Price: ${price}
+
+Platform Metrics:
+{platform_metrics}"""
+
+_PREDICTION_TEMPLATE = """Product ID: {product_id}
+Historical Data{history_note}: {historical_data}"""
+
+# Max history points sent with a trajectory prediction prompt
+HISTORY_MAX_POINTS = 30
+
+_MERCHANT_TEMPLATE = """Product: {name}
+Category: {category}
+Current Trend Score: {trend_score}
+Platforms: {platforms}
+
+Competition Level: {competition_level}
+Market Size: {market_size}
+Growth Rate: {growth_rate}"""
+
+_CONSUMER_TEMPLATE = """Product: {name}
+Category: {category}
+Current Price: ${price}
+Popularity Score: {trend_score}
+
+Price History: {price_history}
+Social Proof: {social_proof}"""
+
+_PLATFORM_TEMPLATE = """Platform Summary: {platform_summary}"""
+
+
+@dataclass(frozen=True, slots=True)
+class _PromptEnvelope:
+    """Encoded model request, built once and shared by cache, coalescing and logs"""
+    key: str
+    body: bytes
+    tokens: int  # Rough input token estimate (~4 chars per token)
+
+
+def _compact_json(value) -> str:
+    """Serialize prompt data without indentation whitespace"""
+    return orjson.dumps(value, default=str).decode()
+
+
+class _TrendAnalysis(BaseModel):
+    """Trend analysis completion; fields beyond the required ones pass through"""
+    model_config = ConfigDict(extra='allow')
+    
+    trend_score: float
+    viral_velocity: float
+    status: str
+
+
+class _TrendPrediction(BaseModel):
+    """Trajectory prediction completion"""
+    predicted_peak_date: Optional[str] = None
+    confidence_score: float = 0.0
+    duration_days: Optional[int] = None
+    recommendation: str = 'No recommendation available'
+    factors: Dict[str, Any] = {}
+    
+    @field_validator('duration_days', mode='before')
+    @classmethod
+    def _coerce_duration(cls, value):
+        # 0 or empty durations mean no estimate; fractional days truncate
+        return int(value) if value else None
+    
+    @field_validator('predicted_peak_date', mode='before')
+    @classmethod
+    def _coerce_peak_date(cls, value):
+        return None if value is None else str(value)
+    
+    @field_validator('recommendation', mode='before')
+    @classmethod
+    def _coerce_recommendation(cls, value):
+        return str(value)
+    
+    @field_validator('factors', mode='before')
+    @classmethod
+    def _coerce_factors(cls, value):
+        # Empty lists and key/value pairs convert like dict() did
+        return dict(value)
+
+
+def product_tag(product_id: str) -> str:
+    """Cache tag for entries dropped by BedrockAgentService.invalidate"""
+    return f"bedrock:{product_id}"
+
+
+def _json_payload(text: str) -> str:
+    """Get the JSON payload of a completion, fenced or bare"""
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def _extract_json(text: str):
+    """Parse the JSON payload of a completion"""
+    return orjson.loads(_json_payload(text))
+
+
+def _compress_history(history: List[Dict], max_points: int = HISTORY_MAX_POINTS) -> List[Dict]:
+    """
+    Condense a metric history for prompting
+    
+    Entries are ordered by date, runs of consecutive entries with the same
+    values collapse to their first entry, and the rest is evenly sampled
+    down to max_points, always keeping the first and last points.
+    """
+    if len(history) <= max_points:
+        return history
+    
+    history = sorted(history, key=lambda entry: str(entry.get('date', '')))
+    
+    condensed = []
+    previous = None
+    for entry in history:
+        values = {k: v for k, v in entry.items() if k != 'date'}
+        if values != previous:
+            condensed.append(entry)
+            previous = values
+    if condensed[-1] is not history[-1]:
+        condensed.append(history[-1])
+    
+    if len(condensed) > max_points:
+        step = (len(condensed) - 1) / (max_points - 1)
+        condensed = [condensed[round(i * step)] for i in range(max_points)]
+    
+    return condensed
+
+
+async def collect(stream: AsyncIterator[str]) -> str:
+    """Join a streamed completion into the full text"""
+    return "".join([chunk async for chunk in stream])
+
+
+def _split_s3_uri(uri: str):
+    """Split an s3://bucket/key URI into (bucket, key)"""
+    bucket, _, key = uri.removeprefix('s3://').partition('/')
+    return bucket, key
+
 
 class BedrockAgentService:
     """Service for AWS Bedrock Agent interactions"""
     
     def __init__(self):
-        self.bedrock_agent = boto3.client(
-            'bedrock-agent-runtime',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-        self.bedrock_runtime = boto3.client(
-            'bedrock-runtime',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        # Bounds in-flight model calls to stay within Bedrock quotas
+        self._semaphore = asyncio.Semaphore(settings.BEDROCK_MAX_CONCURRENCY)
+        # In-flight completions by cache key, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    @property
+    def bedrock_agent(self):
+        """Shared bedrock-agent-runtime client, created on first use"""
+        return _get_client('bedrock-agent-runtime')
+    
+    @property
+    def bedrock_runtime(self):
+        """Shared bedrock-runtime client, created on first use"""
+        return _get_client('bedrock-runtime')
+    
+    async def batch(self, jobs: Iterable[Awaitable[Dict]]) -> List:
+        """
+        Run independent service calls concurrently
+        
+        Results are returned in job order; a failed job yields its exception.
+        """
+        return await asyncio.gather(*jobs, return_exceptions=True)
         
     async def analyze_trend_data(
         self, 
@@ -42,23 +352,15 @@ class BedrockAgentService:
         try:
             prompt = self._build_analysis_prompt(product_data, platform_metrics)
             
-            response = self.bedrock_runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7
-                })
+            text = await self._invoke(
+                _ANALYSIS_SYSTEM,
+                prompt,
+                max_tokens=_ANALYSIS_MAX_TOKENS,
+                temperature=0.7,
+                expire=settings.BEDROCK_CACHE_TTL,
+                product_id=product_data.get('id')
             )
-            
-            response_body = json.loads(response['body'].read())
-            analysis = self._parse_analysis_response(response_body)
+            analysis = self._parse_analysis_response(text)
             
             logger.info(f"Trend analysis completed for product: {product_data.get('name')}")
             return analysis
@@ -67,6 +369,49 @@ class BedrockAgentService:
             logger.error(f"Error in Bedrock trend analysis: {str(e)}")
             return self._get_fallback_analysis()
     
+    def stream_trend_analysis(
+        self,
+        product_data: Dict,
+        platform_metrics: List[Dict]
+    ) -> AsyncIterator[str]:
+        """
+        Stream the trend analysis completion as it is generated
+        
+        Yields raw text deltas for incremental display; pass the stream to
+        collect() and _parse_analysis_response for the parsed result.
+        """
+        prompt = self._build_analysis_prompt(product_data, platform_metrics)
+        return self.stream_completion(_ANALYSIS_SYSTEM, prompt, max_tokens=_ANALYSIS_MAX_TOKENS, temperature=0.7)
+    
+    async def stream_completion(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream text deltas of a model completion as they arrive"""
+        body = orjson.dumps(self._request_body(system, prompt, max_tokens, temperature))
+        
+        async with self._semaphore:
+            response = await asyncio.to_thread(
+                self.bedrock_runtime.invoke_model_with_response_stream,
+                modelId=_MODEL_ID,
+                body=body
+            )
+            
+            events = iter(response['body'])
+            while True:
+                event = await asyncio.to_thread(next, events, None)
+                if event is None:
+                    break
+                if 'chunk' not in event:
+                    continue
+                
+                chunk = orjson.loads(event['chunk']['bytes'])
+                if chunk.get('type') == 'content_block_delta':
+                    yield chunk['delta'].get('text', '')
+    
     async def invoke_agent(
         self,
         session_id: str,
@@ -87,13 +432,7 @@ class BedrockAgentService:
             if session_state:
                 params['sessionState'] = session_state
             
-            response = self.bedrock_agent.invoke_agent(**params)
-            
-            completion = ""
-            for event in response.get('completion', []):
-                if 'chunk' in event:
-                    chunk = event['chunk']
-                    completion += chunk.get('bytes', b'').decode('utf-8')
+            completion = await asyncio.to_thread(self._invoke_agent_sync, params)
             
             return {
                 'response': completion,
@@ -114,41 +453,17 @@ class BedrockAgentService:
         Predict product trend trajectory using Bedrock
         """
         try:
-            prompt = f"""
-            Analyze the following product trend data and predict its trajectory:
-            
-            Product ID: {product_id}
-            Historical Data: {json.dumps(historical_data, indent=2)}
-            
-            Provide:
-            1. Predicted peak date (format: YYYY-MM-DD)
-            2. Confidence score (0-1)
-            3. Estimated duration in days
-            4. Key factors influencing the trend
-            5. Recommendation (buy now, wait, avoid)
-            
-            Format as JSON with these exact keys:
-            {{
-                "predicted_peak_date": "YYYY-MM-DD or null",
-                "confidence_score": 0.0-1.0,
-                "duration_days": integer or null,
-                "factors": {{"factor_name": importance_score}},
-                "recommendation": "string"
-            }}
-            """
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1500,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.5
-                })
+            prompt = self._build_prediction_prompt(product_id, historical_data)
+            
+            text = await self._invoke(
+                _PREDICTION_SYSTEM,
+                prompt,
+                max_tokens=_PREDICTION_MAX_TOKENS,
+                temperature=0.5,
+                expire=settings.BEDROCK_PREDICTION_CACHE_TTL,
+                product_id=product_id
             )
-            
-            result = json.loads(response['body'].read())
-            prediction = self._parse_prediction(result['content'][0]['text'])
+            prediction = self._parse_prediction(text)
             
             return prediction
             
@@ -166,41 +481,25 @@ class BedrockAgentService:
         Generate AI-powered merchant insights
         """
         try:
-            prompt = f"""
-            As a business intelligence analyst, analyze this product opportunity:
-            
-            Product: {product_data.get('name')}
-            Category: {product_data.get('category')}
-            Current Trend Score: {product_data.get('trend_score')}
-            Platforms: {', '.join(product_data.get('platforms', []))}
-            
-            Competition Level: {competition_data.get('level')}
-            Market Size: {market_data.get('size')}
-            Growth Rate: {market_data.get('growth_rate')}
-            
-            Provide merchant-specific insights:
-            1. Sourcing recommendations (suppliers, costs, MOQ)
-            2. Profit margin estimates
-            3. Inventory recommendations (how many units to stock)
-            4. Target market segments
-            5. Marketing strategy suggestions
-            6. Risk factors to consider
-            
-            Format as JSON.
-            """
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7
-                })
+            prompt = _MERCHANT_TEMPLATE.format(
+                name=product_data.get('name'),
+                category=product_data.get('category'),
+                trend_score=product_data.get('trend_score'),
+                platforms=', '.join(product_data.get('platforms', [])),
+                competition_level=competition_data.get('level'),
+                market_size=market_data.get('size'),
+                growth_rate=market_data.get('growth_rate')
             )
             
-            result = json.loads(response['body'].read())
-            insights = self._parse_merchant_insights(result['content'][0]['text'])
+            text = await self._invoke(
+                _MERCHANT_SYSTEM,
+                prompt,
+                max_tokens=_MERCHANT_MAX_TOKENS,
+                temperature=0.7,
+                expire=settings.BEDROCK_CACHE_TTL,
+                product_id=product_data.get('id')
+            )
+            insights = self._parse_merchant_insights(text)
             
             return insights
             
@@ -218,40 +517,24 @@ class BedrockAgentService:
         Generate AI-powered consumer insights
         """
         try:
-            prompt = f"""
-            As a shopping advisor, analyze this product for consumers:
-            
-            Product: {product_data.get('name')}
-            Category: {product_data.get('category')}
-            Current Price: ${product_data.get('price', 0)}
-            Popularity Score: {product_data.get('trend_score')}
-            
-            Price History: {json.dumps(price_history, indent=2)}
-            Social Proof: {json.dumps(social_proof, indent=2)}
-            
-            Provide consumer-specific insights:
-            1. Is this a good time to buy? (yes/no with reasoning)
-            2. Price trend analysis (rising/falling/stable)
-            3. Value assessment (good value/overpriced/fair)
-            4. Alternative recommendations
-            5. Best platform to purchase from
-            6. Gift suitability (occasions, age groups)
-            
-            Format as JSON.
-            """
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7
-                })
+            prompt = _CONSUMER_TEMPLATE.format(
+                name=product_data.get('name'),
+                category=product_data.get('category'),
+                price=product_data.get('price', 0),
+                trend_score=product_data.get('trend_score'),
+                price_history=_compact_json(price_history),
+                social_proof=_compact_json(social_proof)
             )
             
-            result = json.loads(response['body'].read())
-            insights = self._parse_consumer_insights(result['content'][0]['text'])
+            text = await self._invoke(
+                _CONSUMER_SYSTEM,
+                prompt,
+                max_tokens=_CONSUMER_MAX_TOKENS,
+                temperature=0.7,
+                expire=settings.BEDROCK_CONSUMER_CACHE_TTL,
+                product_id=product_data.get('id')
+            )
+            insights = self._parse_consumer_insights(text)
             
             return insights
             
@@ -269,42 +552,28 @@ class BedrockAgentService:
         try:
             platform_summary = {}
             for platform, items in platform_data.items():
+                # Engagement and views in a single pass over the items
+                total_engagement = total_views = 0
+                for item in items:
+                    total_engagement += item.get('likes', 0) + item.get('shares', 0) + item.get('comments', 0)
+                    total_views += item.get('views', 0)
+                
                 platform_summary[platform] = {
                     'item_count': len(items),
-                    'total_engagement': sum(
-                        item.get('likes', 0) + item.get('shares', 0) + item.get('comments', 0)
-                        for item in items
-                    ),
-                    'avg_views': sum(item.get('views', 0) for item in items) / len(items) if items else 0
+                    'total_engagement': total_engagement,
+                    'avg_views': total_views / len(items) if items else 0
                 }
             
-            prompt = f"""
-            Analyze cross-platform trend patterns:
-            
-            Platform Summary: {json.dumps(platform_summary, indent=2)}
+            prompt = _PLATFORM_TEMPLATE.format(platform_summary=_compact_json(platform_summary))
             
-            Identify:
-            1. Which platforms show strongest trends
-            2. Platform-specific patterns (e.g., TikTok viral vs Amazon sales)
-            3. Cross-platform correlation insights
-            4. Emerging vs declining platforms for this trend
-            5. Recommended platform focus for merchants
-            
-            Format as JSON with actionable insights.
-            """
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.6
-                })
+            text = await self._invoke(
+                _PLATFORM_SYSTEM,
+                prompt,
+                max_tokens=_PLATFORM_MAX_TOKENS,
+                temperature=0.6,
+                expire=settings.BEDROCK_CACHE_TTL
             )
-            
-            result = json.loads(response['body'].read())
-            analysis = self._parse_multi_platform_analysis(result['content'][0]['text'])
+            analysis = self._parse_multi_platform_analysis(text)
             
             return analysis
             
@@ -312,66 +581,261 @@ class BedrockAgentService:
             logger.error(f"Error analyzing multi-platform trends: {str(e)}")
             return self._get_fallback_platform_analysis()
     
-    def _build_analysis_prompt(
+    async def invalidate(self, product_id: str):
+        """
+        Drop cached completions and responses for a product
+        
+        Call when new data for the product arrives so predictions and
+        insights are regenerated instead of served stale. Covers any
+        response cached with product_tag(product_id).
+        """
+        await invalidate_tag(product_tag(product_id))
+    
+    async def _invoke(
         self,
-        product_data: Dict,
-        platform_metrics: List[Dict]
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        expire: int,
+        product_id: Optional[str] = None
+    ) -> str:
+        """
+        Invoke the model and return its text completion
+        
+        Completions are cached in Redis keyed on the exact request, so
+        repeated identical prompts skip the Bedrock round-trip, and
+        concurrent identical requests share one in-flight call. Entries
+        for a product_id can be dropped with invalidate().
+        """
+        envelope = self._build_envelope(system, prompt, max_tokens, temperature)
+        
+        task = self._inflight.get(envelope.key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_completion(envelope, expire, product_id))
+            self._inflight[envelope.key] = task
+        
+        # Shield the shared call from cancellation of any single caller
+        return await asyncio.shield(task)
+    
+    async def _fetch_completion(
+        self,
+        envelope: _PromptEnvelope,
+        expire: int,
+        product_id: Optional[str]
+    ) -> str:
+        """Get a completion from the cache, or from Bedrock and cache it"""
+        try:
+            text = await get_raw(envelope.key)
+            if text is not None:
+                return text
+            
+            logger.debug(f"Bedrock call {envelope.key} (~{envelope.tokens} input tokens)")
+            async with self._semaphore:
+                text = await asyncio.to_thread(self._invoke_model_sync, envelope.body)
+            
+            await set_raw(envelope.key, text, expire)
+            if product_id:
+                await tag_keys(envelope.key, [product_tag(product_id)], PRODUCT_TAG_TTL)
+            return text
+        finally:
+            self._inflight.pop(envelope.key, None)
+    
+    def _build_envelope(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> _PromptEnvelope:
+        """Encode a request body and derive its cache key once"""
+        body = orjson.dumps(
+            self._request_body(system, prompt, max_tokens, temperature),
+            option=orjson.OPT_SORT_KEYS
+        )
+        digest = hashlib.blake2b(
+            _MODEL_ID.encode() + b"\n" + body,
+            digest_size=16
+        ).hexdigest()
+        
+        return _PromptEnvelope(
+            key=f"{CACHE_PREFIX}:bedrock:{digest}",
+            body=body,
+            tokens=(len(system) + len(prompt)) // 4
+        )
+    
+    def _request_body(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Dict:
+        """Build an Anthropic Messages API request body"""
+        system_block = {"type": "text", "text": system}
+        if settings.BEDROCK_PROMPT_CACHING:
+            # Let Bedrock reuse the static system prefix across calls
+            system_block["cache_control"] = {"type": "ephemeral"}
+        
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "system": [system_block],
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "stop_sequences": _STOP_SEQUENCES
+        }
+    
+    def _invoke_model_sync(self, body: bytes) -> str:
+        """Blocking invoke_model call and body read, run in a worker thread"""
+        response = self.bedrock_runtime.invoke_model(
+            modelId=_MODEL_ID,
+            body=body
+        )
+        
+        result = orjson.loads(response['body'].read())
+        return result['content'][0]['text']
+    
+    def _invoke_agent_sync(self, params: Dict) -> str:
+        """Blocking invoke_agent call and completion drain, run in a worker thread"""
+        response = self.bedrock_agent.invoke_agent(**params)
+        
+        completion = ""
+        for event in response.get('completion', []):
+            if 'chunk' in event:
+                chunk = event['chunk']
+                completion += chunk.get('bytes', b'').decode('utf-8')
+        
+        return completion
+    
+    async def submit_batch_prediction(
+        self,
+        jobs: List[Dict],
+        s3_input_uri: str,
+        s3_output_uri: str
     ) -> str:
-        """Build prompt for trend analysis"""
-        return f"""
-        Analyze this product's trending status across multiple platforms:
+        """
+        Submit trajectory predictions as a Bedrock batch inference job
+        
+        Each job is a dict with 'product_id' and 'historical_data'. Prompts
+        are written as JSONL to s3_input_uri and results land under
+        s3_output_uri. Returns the job ARN for poll_batch.
+        """
+        records = b"\n".join(
+            orjson.dumps({
+                "recordId": job['product_id'],
+                "modelInput": self._request_body(
+                    _PREDICTION_SYSTEM,
+                    self._build_prediction_prompt(job['product_id'], job['historical_data']),
+                    max_tokens=_PREDICTION_MAX_TOKENS,
+                    temperature=0.5
+                )
+            })
+            for job in jobs
+        )
         
-        Product: {product_data.get('name')}
-        Category: {product_data.get('category')}
-        Price: ${product_data.get('price', 0)}
+        bucket, key = _split_s3_uri(s3_input_uri)
+        await asyncio.to_thread(
+            _get_client('s3').put_object,
+            Bucket=bucket,
+            Key=key,
+            Body=records
+        )
         
-        Platform Metrics:
-        {json.dumps(platform_metrics, indent=2)}
+        response = await asyncio.to_thread(
+            _get_client('bedrock').create_model_invocation_job,
+            # Unique even for submissions within the same second
+            jobName=f"trend-predictions-{int(time.time())}-{uuid.uuid4().hex[:8]}",
+            roleArn=settings.BEDROCK_BATCH_ROLE_ARN,
+            modelId=_MODEL_ID,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": s3_input_uri}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": s3_output_uri}}
+        )
         
-        Calculate and provide:
-        1. Overall trend score (0-1, where 1 is highest trending)
-        2. Viral velocity (rate of growth, 0-1)
-        3. Trend status (emerging/rising/peak/declining/stable)
-        4. Platform-specific insights
-        5. Competitive analysis
-        6. Key factors driving the trend
+        logger.info(f"Submitted batch prediction job for {len(jobs)} products")
+        return response['jobArn']
+    
+    async def poll_batch(self, job_arn: str) -> Dict:
+        """
+        Check a batch prediction job, parsing its results once completed
         
-        Provide response as JSON with these exact keys:
-        {{
-            "trend_score": 0.0-1.0,
-            "viral_velocity": 0.0-1.0,
-            "status": "emerging|rising|peak|declining|stable",
-            "platform_insights": {{"platform_name": "insight"}},
-            "competitive_analysis": "string",
-            "key_factors": ["factor1", "factor2"],
-            "confidence": 0.0-1.0
-        }}
+        Returns the job status and, when completed, predictions keyed by
+        product ID.
         """
+        job = await asyncio.to_thread(
+            _get_client('bedrock').get_model_invocation_job,
+            jobIdentifier=job_arn
+        )
+        
+        status = job['status']
+        if status != 'Completed':
+            return {'status': status, 'predictions': {}}
+        
+        # Output is written to <output prefix>/<job id>/<input file>.out
+        _, input_key = _split_s3_uri(job['inputDataConfig']['s3InputDataConfig']['s3Uri'])
+        bucket, output_prefix = _split_s3_uri(job['outputDataConfig']['s3OutputDataConfig']['s3Uri'])
+        job_id = job_arn.rsplit('/', 1)[-1]
+        output_key = f"{output_prefix.rstrip('/')}/{job_id}/{input_key.rsplit('/', 1)[-1]}.out"
+        
+        response = await asyncio.to_thread(
+            _get_client('s3').get_object,
+            Bucket=bucket,
+            Key=output_key
+        )
+        body = await asyncio.to_thread(response['Body'].read)
+        
+        predictions = {}
+        for line in body.splitlines():
+            if not line:
+                continue
+            record = orjson.loads(line)
+            output = record.get('modelOutput')
+            if output:
+                predictions[record['recordId']] = self._parse_prediction(output['content'][0]['text'])
+            else:
+                predictions[record['recordId']] = self._get_fallback_prediction()
+        
+        return {'status': status, 'predictions': predictions}
     
-    def _parse_analysis_response(self, response: Dict) -> Dict:
+    def _build_prediction_prompt(
+        self,
+        product_id: str,
+        historical_data: List[Dict]
+    ) -> str:
+        """Build the per-product part of the trajectory prediction prompt"""
+        history = _compress_history(historical_data)
+        if len(history) < len(historical_data):
+            history_note = f" ({len(history)} points condensed from {len(historical_data)}, unchanged runs collapsed)"
+        else:
+            history_note = ""
+        
+        return _PREDICTION_TEMPLATE.format(
+            product_id=product_id,
+            history_note=history_note,
+            historical_data=_compact_json(history)
+        )
+    
+    def _build_analysis_prompt(
+        self,
+        product_data: Dict,
+        platform_metrics: List[Dict]
+    ) -> str:
+        """Build the per-product part of the trend analysis prompt"""
+        return _ANALYSIS_TEMPLATE.format(
+            name=product_data.get('name'),
+            category=product_data.get('category'),
+            price=product_data.get('price', 0),
+            platform_metrics=_compact_json(platform_metrics)
+        )
+    
+    def _parse_analysis_response(self, content: str) -> Dict:
         """Parse Bedrock analysis response"""
         try:
-            content = response.get('content', [{}])[0].get('text', '{}')
+            # Parse and validate required fields in one pass
+            return _TrendAnalysis.model_validate_json(_json_payload(content)).model_dump()
             
-            # Extract JSON from markdown code blocks if present
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            parsed = json.loads(content)
-            
-            # Validate required fields
-            required_fields = ['trend_score', 'viral_velocity', 'status']
-            for field in required_fields:
-                if field not in parsed:
-                    logger.warning(f"Missing required field: {field}")
-                    return self._get_fallback_analysis()
-            
-            return parsed
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+        except ValidationError as e:
+            logger.warning(f"Invalid analysis response: {str(e)}")
             return self._get_fallback_analysis()
         except Exception as e:
             logger.error(f"Error parsing analysis response: {str(e)}")
@@ -380,21 +844,8 @@ class BedrockAgentService:
     def _parse_prediction(self, text: str) -> Dict:
         """Parse prediction from text response"""
         try:
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            
-            parsed = json.loads(text)
-            
-            # Ensure proper types
-            return {
-                'predicted_peak_date': parsed.get('predicted_peak_date'),
-                'confidence_score': float(parsed.get('confidence_score', 0.0)),
-                'duration_days': int(parsed.get('duration_days', 0)) if parsed.get('duration_days') else None,
-                'recommendation': str(parsed.get('recommendation', 'No recommendation available')),
-                'factors': dict(parsed.get('factors', {}))
-            }
+            # Parse and coerce to the expected types in one pass
+            return _TrendPrediction.model_validate_json(_json_payload(text)).model_dump()
             
         except Exception as e:
             logger.error(f"Error parsing prediction: {str(e)}")
@@ -403,12 +854,7 @@ class BedrockAgentService:
     def _parse_merchant_insights(self, text: str) -> Dict:
         """Parse merchant insights from response"""
         try:
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            
-            return json.loads(text)
+            return _extract_json(text)
             
         except Exception as e:
             logger.error(f"Error parsing merchant insights: {str(e)}")
@@ -417,12 +863,7 @@ class BedrockAgentService:
     def _parse_consumer_insights(self, text: str) -> Dict:
         """Parse consumer insights from response"""
         try:
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            
-            return json.loads(text)
+            return _extract_json(text)
             
         except Exception as e:
             logger.error(f"Error parsing consumer insights: {str(e)}")
@@ -431,12 +872,7 @@ class BedrockAgentService:
     def _parse_multi_platform_analysis(self, text: str) -> Dict:
         """Parse multi-platform analysis from response"""
         try:
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0].strip()
-            elif '```' in text:
-                text = text.split('```')[1].split('```')[0].strip()
-            
-            return json.loads(text)
+            return _extract_json(text)
             
         except Exception as e:
             logger.error(f"Error parsing platform analysis: {str(e)}")
@@ -4,11 +4,14 @@ Aggregates data from all sources and calculates trend scores
 """
 
 import asyncio
+import math
+import re
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
+from operator import itemgetter
 import numpy as np
-from app.config import get_settings, SUPPORTED_PLATFORMS
+from app.config import get_settings, PLATFORM_INDEX, PLATFORM_WEIGHTS
 from app.models.trends import Product, PlatformMetrics, TrendStatus
 from app.services.bedrock_agent import BedrockAgentService
 from app.services.sagemaker_predictor import SageMakerPredictor
@@ -16,45 +19,124 @@ from app.services.nova_connector import NovaConnector
 from app.services.strands_ingestion import StrandsIngestionService
 from app.services.amazon_q_service import AmazonQService
 from app.utils.logger import get_logger
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Weights of the engagement, view, growth and platform-reach scores
+SCORE_COMPONENT_WEIGHTS = np.array([0.35, 0.25, 0.30, 0.10])
+
+# Platform weights by PLATFORM_INDEX, with a trailing default for unknown platforms
+UNKNOWN_PLATFORM_INDEX = len(PLATFORM_WEIGHTS)
+PLATFORM_WEIGHT_VECTOR = np.array(PLATFORM_WEIGHTS + (0.1,))
+
+# Trend statuses in the order their rules are checked, stable last as the default
+TREND_STATUS_RULE_ORDER = (
+    TrendStatus.EMERGING,
+    TrendStatus.RISING,
+    TrendStatus.PEAK,
+    TrendStatus.DECLINING,
+    TrendStatus.STABLE
+)
+
+# Category keywords, checked in order against casefolded product names
+CATEGORY_PATTERNS = tuple(
+    (category, re.compile('|'.join(map(re.escape, words))))
+    for category, words in (
+        ('Electronics', ('phone', 'laptop', 'computer', 'tablet', 'headphone', 'camera')),
+        ('Fashion', ('dress', 'shirt', 'pants', 'shoe', 'jacket', 'accessory')),
+        ('Beauty', ('makeup', 'skincare', 'cosmetic', 'beauty', 'cream', 'serum')),
+        ('Home & Garden', ('furniture', 'decor', 'garden', 'kitchen', 'bedding')),
+    )
+)
+
 
 class DataAggregator:
     """Aggregates and analyzes data from all platforms"""
     
+    # Max number of cached aggregation results
+    CACHE_SIZE = 128
+    
     def __init__(self):
         self.bedrock = BedrockAgentService()
         self.sagemaker = SageMakerPredictor()
         self.amazon_q = AmazonQService()
+        self.strands = StrandsIngestionService()
+        self._trend_cache = TTLCache(self.CACHE_SIZE, settings.AGGREGATION_CACHE_TTL)
+    
+    async def close(self):
+        """Close pooled connections held by the data sources"""
+        await self.strands.close()
     
     async def aggregate_product_trends(
         self,
         keywords: List[str],
         categories: List[str],
-        days_back: int = 7
+        days_back: int = 7,
+        min_trend_score: Optional[float] = None,
+        platforms: Optional[List[str]] = None
     ) -> List[Product]:
-        """Aggregate trends from all platforms"""
+        """
+        Aggregate trends from all platforms
+        
+        Products below min_trend_score or not seen on any of platforms
+        are dropped before the expensive scoring and prediction steps.
+        Results are cached for AGGREGATION_CACHE_TTL seconds, and
+        concurrent calls with the same arguments share one aggregation.
+        """
+        key = (
+            tuple(sorted(keywords)),
+            tuple(sorted(categories)),
+            days_back,
+            min_trend_score,
+            tuple(sorted(platforms or ()))
+        )
+        
+        # Empty results usually mean an upstream failure, so are not cached
+        products = await self._trend_cache.get_or_fetch(
+            key,
+            lambda: self._aggregate_product_trends(
+                keywords, categories, days_back, min_trend_score, platforms
+            ),
+            should_cache=bool
+        )
+        return list(products)
+    
+    async def _aggregate_product_trends(
+        self,
+        keywords: List[str],
+        categories: List[str],
+        days_back: int,
+        min_trend_score: Optional[float],
+        platforms: Optional[List[str]]
+    ) -> List[Product]:
+        """Fetch, merge, score and enrich products from all sources"""
+        # One clock reading shared by every step of this aggregation
+        now = datetime.utcnow()
         try:
             # Fetch data from all sources
             async with NovaConnector() as nova:
                 hashtags = [f"#{kw.replace(' ', '')}" for kw in keywords]
                 social_data = await nova.fetch_all_platforms(keywords, hashtags)
             
-            strands = StrandsIngestionService()
-            sales_data = await strands.ingest_all_platforms(days_back)
+            sales_data = await self.strands.ingest_all_platforms(days_back)
             
             # Process and merge data
             products = await self._process_all_data(
                 social_data,
                 sales_data,
                 keywords,
-                categories
+                categories,
+                now,
+                platforms
             )
             
             # Calculate trend scores
-            products = await self._calculate_trend_scores(products)
+            products = await self._calculate_trend_scores(products, now)
+            
+            if min_trend_score is not None:
+                products = [p for p in products if p.trend_score >= min_trend_score]
             
             # Get ML predictions
             products = await self._enrich_with_predictions(products)
@@ -71,15 +153,17 @@ class DataAggregator:
         social_data: Dict,
         sales_data: Dict,
         keywords: List[str],
-        categories: List[str]
+        categories: List[str],
+        now: datetime,
+        platforms: Optional[List[str]] = None
     ) -> List[Product]:
         """Process and merge data from all sources"""
-        product_map = defaultdict(lambda: {
-            'platforms': set(),
-            'metrics': {},
-            'mentions': 0,
-            'total_engagement': 0
-        })
+        # Per-product accumulators, keyed by product key
+        product_platforms = defaultdict(set)
+        product_metrics = defaultdict(dict)
+        mentions = Counter()
+        engagement = defaultdict(int)
+        sales = {}
         
         # Process social media data
         for platform, items in social_data.items():
@@ -87,80 +171,108 @@ class DataAggregator:
                 product_key = self._extract_product_identifier(item)
                 
                 if product_key:
-                    product_map[product_key]['platforms'].add(platform)
-                    product_map[product_key]['metrics'][platform] = self._extract_platform_metrics(item, platform)
-                    product_map[product_key]['mentions'] += 1
-                    product_map[product_key]['total_engagement'] += self._calculate_engagement(item)
+                    product_platforms[product_key].add(platform)
+                    item_engagement = self._calculate_engagement(item)
+                    product_metrics[product_key][platform] = self._extract_platform_metrics(item, platform, item_engagement, now)
+                    mentions[product_key] += 1
+                    engagement[product_key] += item_engagement
         
         # Process sales data
         for platform, items in sales_data.items():
             for item in items:
                 product_id = item.get('product_id')
-                product_name = item.get('product_name')
                 
                 if product_id:
                     key = f"{platform}_{product_id}"
-                    product_map[key]['platforms'].add(platform)
-                    product_map[key]['sales_data'] = item
-                    product_map[key]['product_name'] = product_name
+                    product_platforms[key].add(platform)
+                    sales[key] = item
         
         # Convert to Product objects
+        platforms_set = frozenset(platforms or ())
         products = []
-        for key, data in product_map.items():
-            if len(data['platforms']) > 0:  # At least one platform
-                product = await self._create_product_from_data(key, data)
-                if product:
-                    products.append(product)
+        for key, key_platforms in product_platforms.items():
+            if platforms_set and platforms_set.isdisjoint(key_platforms):
+                continue
+            
+            sales_item = sales.get(key)
+            data = {
+                'platforms': key_platforms,
+                'metrics': product_metrics.get(key, {}),
+                'mentions': mentions[key],
+                'total_engagement': engagement.get(key, 0)
+            }
+            if sales_item is not None:
+                data['sales_data'] = sales_item
+                data['product_name'] = sales_item.get('product_name')
+            
+            product = await self._create_product_from_data(key, data, now)
+            if product:
+                products.append(product)
         
         return products
     
     async def _calculate_trend_scores(
         self,
-        products: List[Product]
+        products: List[Product],
+        now: datetime
     ) -> List[Product]:
-        """Calculate comprehensive trend scores"""
-        for product in products:
-            try:
-                # Aggregate platform metrics
-                total_engagement = 0
-                total_views = 0
-                total_growth = 0
-                platform_count = len(product.platforms)
-                
+        """
+        Calculate comprehensive trend scores
+        
+        Metrics of all products are flattened into parallel arrays with one
+        entry per (product, platform) pair and reduced per product in bulk.
+        """
+        if not products:
+            return products
+        
+        try:
+            # Flatten platform metrics into structure-of-arrays form
+            rows = []
+            engagement = []
+            views = []
+            growth = []
+            platform_indices = []
+            for i, product in enumerate(products):
                 for platform, metrics in product.platform_metrics.items():
-                    weight = SUPPORTED_PLATFORMS.get(platform, {}).get('weight', 0.1)
-                    
-                    total_engagement += metrics.engagement_count * weight
-                    total_views += metrics.views * weight
-                    total_growth += metrics.growth_rate * weight
-                
-                # Calculate base score
-                engagement_score = min(total_engagement / 100000, 1.0)  # Normalize
-                view_score = min(total_views / 1000000, 1.0)
-                growth_score = min(total_growth, 1.0)
-                platform_score = min(platform_count / 5, 1.0)  # Max 5 platforms
-                
-                # Weighted average
-                product.trend_score = (
-                    engagement_score * 0.35 +
-                    view_score * 0.25 +
-                    growth_score * 0.30 +
-                    platform_score * 0.10
-                )
-                
-                # Calculate viral velocity
-                days_active = (datetime.utcnow() - product.first_seen).days or 1
-                product.viral_velocity = total_growth / days_active
-                
-                # Determine status
-                product.status = self._determine_trend_status(
-                    product.trend_score,
-                    product.viral_velocity,
-                    days_active
-                )
-                
-            except Exception as e:
-                logger.error(f"Error calculating trend score for {product.id}: {str(e)}")
+                    rows.append(i)
+                    engagement.append(metrics.engagement_count)
+                    views.append(metrics.views)
+                    growth.append(metrics.growth_rate)
+                    platform_indices.append(PLATFORM_INDEX.get(platform, UNKNOWN_PLATFORM_INDEX))
+            
+            # Weighted per-product totals
+            n = len(products)
+            rows = np.asarray(rows, dtype=np.intp)
+            weights = PLATFORM_WEIGHT_VECTOR[np.asarray(platform_indices, dtype=np.intp)]
+            total_engagement = np.bincount(rows, np.asarray(engagement, dtype=np.float64) * weights, minlength=n)
+            total_views = np.bincount(rows, np.asarray(views, dtype=np.float64) * weights, minlength=n)
+            total_growth = np.bincount(rows, np.asarray(growth, dtype=np.float64) * weights, minlength=n)
+            platform_count = np.fromiter((len(p.platforms) for p in products), dtype=np.float64, count=n)
+            
+            # Normalized component scores, combined as a weighted average
+            components = np.column_stack((
+                np.minimum(total_engagement / 100000, 1.0),
+                np.minimum(total_views / 1000000, 1.0),
+                np.minimum(total_growth, 1.0),
+                np.minimum(platform_count / 5, 1.0)  # Max 5 platforms
+            ))
+            scores = components @ SCORE_COMPONENT_WEIGHTS
+            
+            # Calculate viral velocity
+            days_active = np.fromiter(((now - p.first_seen).days or 1 for p in products), dtype=np.int64, count=n)
+            velocities = total_growth / days_active
+            
+            # Determine status
+            statuses = self._determine_trend_statuses(scores, velocities, days_active)
+            
+            for product, score, velocity, status in zip(products, scores.tolist(), velocities.tolist(), statuses):
+                product.trend_score = score
+                product.viral_velocity = velocity
+                product.status = status
+        
+        except Exception as e:
+            logger.error(f"Error calculating trend scores: {str(e)}")
+            for product in products:
                 product.trend_score = 0.0
         
         return products
@@ -176,23 +288,20 @@ class DataAggregator:
             for product in products:
                 product_dict = {
                     'id': product.id,
-                    'platforms': list(product.platforms),
+                    'platforms': product.platforms,
                     'aggregated_metrics': self._aggregate_metrics(product),
                     'historical_scores': [product.trend_score]  # In production, use actual history
                 }
                 product_dicts.append(product_dict)
             
-            # Get predictions
+            # batch_predict chunks the endpoint payloads and bounds concurrency
             predictions = await self.sagemaker.batch_predict(product_dicts)
             
-            # Map predictions back to products
-            prediction_map = {p['product_id']: p for p in predictions}
-            
-            for product in products:
-                if product.id in prediction_map:
-                    pred = prediction_map[product.id]
-                    # Store prediction in product metadata
-                    product.prediction = pred
+            # batch_predict returns one prediction per product, in order,
+            # with fallbacks for products in failed chunks
+            for product, prediction in zip(products, predictions, strict=True):
+                # Store prediction in product metadata
+                product.prediction = prediction
             
         except Exception as e:
             logger.error(f"Error enriching with predictions: {str(e)}")
@@ -212,18 +321,24 @@ class DataAggregator:
         
         return None
     
-    def _extract_platform_metrics(self, item: Dict, platform: str) -> PlatformMetrics:
-        """Extract metrics from platform item"""
+    def _extract_platform_metrics(
+        self,
+        item: Dict,
+        platform: str,
+        engagement: int,
+        now: datetime
+    ) -> PlatformMetrics:
+        """Extract metrics from platform item, given its precomputed engagement and fetch time"""
         return PlatformMetrics(
             platform=platform,
-            engagement_count=self._calculate_engagement(item),
+            engagement_count=engagement,
             views=item.get('views', 0),
             likes=item.get('likes', 0),
             shares=item.get('shares', 0),
             comments=item.get('comments', 0),
             mentions=1,
-            growth_rate=self._calculate_growth_rate(item),
-            timestamp=datetime.utcnow()
+            growth_rate=self._calculate_growth_rate(engagement, item.get('views', 1)),
+            timestamp=now
         )
     
     def _calculate_engagement(self, item: Dict) -> int:
@@ -235,18 +350,16 @@ class DataAggregator:
             item.get('saves', 0)
         )
     
-    def _calculate_growth_rate(self, item: Dict) -> float:
+    def _calculate_growth_rate(self, engagement: int, views: int) -> float:
         """Calculate growth rate (simplified)"""
         # In production, compare with historical data
-        engagement = self._calculate_engagement(item)
-        views = item.get('views', 1)
-        
         return min(engagement / views, 1.0) if views > 0 else 0.0
     
     async def _create_product_from_data(
         self,
         key: str,
-        data: Dict
+        data: Dict,
+        now: datetime
     ) -> Optional[Product]:
         """Create Product object from aggregated data"""
         try:
@@ -264,10 +377,10 @@ class DataAggregator:
                 name=product_name,
                 category=category,
                 description=self._extract_description(data),
-                platforms=list(data['platforms']),
+                platforms=sorted(data['platforms']),
                 platform_metrics=platform_metrics,
-                first_seen=datetime.utcnow() - timedelta(days=7),  # Placeholder
-                last_updated=datetime.utcnow()
+                first_seen=now - timedelta(days=7),  # Placeholder
+                last_updated=now
             )
             
             return product
@@ -287,17 +400,10 @@ class DataAggregator:
     def _infer_category(self, product_name: str, data: Dict) -> str:
         """Infer product category"""
         # Simple keyword matching - in production use ML
-        keywords = {
-            'Electronics': ['phone', 'laptop', 'computer', 'tablet', 'headphone', 'camera'],
-            'Fashion': ['dress', 'shirt', 'pants', 'shoe', 'jacket', 'accessory'],
-            'Beauty': ['makeup', 'skincare', 'cosmetic', 'beauty', 'cream', 'serum'],
-            'Home & Garden': ['furniture', 'decor', 'garden', 'kitchen', 'bedding'],
-        }
-        
-        name_lower = product_name.lower()
+        name_folded = product_name.casefold()
         
-        for category, words in keywords.items():
-            if any(word in name_lower for word in words):
+        for category, pattern in CATEGORY_PATTERNS:
+            if pattern.search(name_folded):
                 return category
         
         return "General"
@@ -314,40 +420,41 @@ class DataAggregator:
         
         return ""
     
-    def _determine_trend_status(
+    def _determine_trend_statuses(
         self,
-        trend_score: float,
-        viral_velocity: float,
-        days_active: int
-    ) -> TrendStatus:
-        """Determine trend status based on metrics"""
-        if viral_velocity > 0.8 and days_active < 3:
-            return TrendStatus.EMERGING
-        elif trend_score > 0.7 and viral_velocity > 0.5:
-            return TrendStatus.RISING
-        elif trend_score > 0.8 and viral_velocity < 0.3:
-            return TrendStatus.PEAK
-        elif trend_score < 0.5 and viral_velocity < 0:
-            return TrendStatus.DECLINING
-        else:
-            return TrendStatus.STABLE
+        trend_scores: np.ndarray,
+        viral_velocities: np.ndarray,
+        days_active: np.ndarray
+    ) -> List[TrendStatus]:
+        """
+        Determine trend statuses based on metrics
+        
+        Rules are evaluated for all products at once; the first rule that
+        holds for a product decides its status, otherwise it is stable.
+        """
+        codes = np.select(
+            [
+                (viral_velocities > 0.8) & (days_active < 3),
+                (trend_scores > 0.7) & (viral_velocities > 0.5),
+                (trend_scores > 0.8) & (viral_velocities < 0.3),
+                (trend_scores < 0.5) & (viral_velocities < 0)
+            ],
+            [0, 1, 2, 3],
+            default=4
+        )
+        return [TREND_STATUS_RULE_ORDER[code] for code in codes.tolist()]
     
     def _aggregate_metrics(self, product: Product) -> Dict:
         """Aggregate all metrics for a product"""
-        total_engagement = 0
-        total_views = 0
+        platform_metrics = product.platform_metrics.values()
         total_reviews = 0
         ratings = []
         
-        for platform, metrics in product.platform_metrics.items():
-            total_engagement += metrics.engagement_count
-            total_views += metrics.views
-        
         return {
-            'total_engagement': total_engagement,
-            'total_views': total_views,
+            'total_engagement': sum(metrics.engagement_count for metrics in platform_metrics),
+            'total_views': sum(metrics.views for metrics in platform_metrics),
             'total_reviews': total_reviews,
-            'avg_rating': np.mean(ratings) if ratings else 0,
+            'avg_rating': math.fsum(ratings) / len(ratings) if ratings else 0.0,
             'growth_rate': product.viral_velocity,
             'platform_count': len(product.platforms)
         }
@@ -358,24 +465,15 @@ class DataAggregator:
         platforms: List[str]
     ) -> Dict:
         """Compare product prices across platforms"""
-        # Implementation for price comparison
-        comparisons = []
-        
-        for platform in platforms:
-            # Fetch price data from each platform
-            # This is a simplified version
-            comparison = {
-                'platform': platform,
-                'price': 0.0,
-                'availability': 'unknown',
-                'shipping': 0.0,
-                'reviews': 0,
-                'rating': 0.0
-            }
-            comparisons.append(comparison)
+        # Fetch price data from all platforms concurrently
+        results = await asyncio.gather(
+            *(self._fetch_price(platform, product_name) for platform in platforms),
+            return_exceptions=True
+        )
+        comparisons = [c for c in results if not isinstance(c, Exception)]
         
         # Find best deal
-        best_deal = min(comparisons, key=lambda x: x['price']) if comparisons else {}
+        best_deal = min(comparisons, key=itemgetter('price')) if comparisons else {}
         
         return {
             'product_name': product_name,
@@ -383,3 +481,15 @@ class DataAggregator:
             'best_deal': best_deal,
             'timestamp': datetime.utcnow().isoformat()
         }
+    
+    async def _fetch_price(self, platform: str, product_name: str) -> Dict:
+        """Fetch price data for a product from one platform"""
+        # This is a simplified version
+        return {
+            'platform': platform,
+            'price': 0.0,
+            'availability': 'unknown',
+            'shipping': 0.0,
+            'reviews': 0,
+            'rating': 0.0
+        }
@@ -5,6 +5,7 @@ Nova SDK integration for social media APIs
 
 import aiohttp
 import asyncio
+import orjson
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from app.config import get_settings, SUPPORTED_PLATFORMS
@@ -21,20 +22,52 @@ class NovaConnector:
         self.api_key = settings.NOVA_API_KEY
         self.base_url = settings.NOVA_API_URL
         self.session = None
+        self._semaphore = None
     
     async def __aenter__(self):
+        # One pooled connector shared by all platforms, reusing DNS lookups and TLS connections
         self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60),
             headers={
                 'Authorization': f'Bearer {self.api_key}',
                 'Content-Type': 'application/json'
             }
         )
+        self._semaphore = asyncio.Semaphore(settings.NOVA_MAX_CONCURRENCY)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
+    async def _request_json(self, method: str, url: str, **kwargs) -> Optional[Dict]:
+        """Send a request under the concurrency limit, returning the JSON body of a 200 response"""
+        async with self._semaphore, self.session.request(method, url, **kwargs) as response:
+            if response.status == 200:
+                return orjson.loads(await response.read())
+            return None
+    
+    async def _request_each(
+        self,
+        method: str,
+        url: str,
+        kwargs_list: List[Dict]
+    ) -> List[Optional[Dict]]:
+        """Send one request per kwargs concurrently, with None for failed requests"""
+        responses = await asyncio.gather(
+            *(self._request_json(method, url, **kwargs) for kwargs in kwargs_list),
+            return_exceptions=True
+        )
+        
+        results = []
+        for response in responses:
+            if isinstance(response, Exception):
+                logger.warning(f"Request to {url} failed: {str(response)}")
+                response = None
+            results.append(response)
+        
+        return results
+    
     async def fetch_youtube_trends(
         self,
         keywords: List[str],
@@ -42,27 +75,31 @@ class NovaConnector:
     ) -> List[Dict]:
         """Fetch trending products from YouTube"""
         try:
-            results = []
+            published_after = (datetime.utcnow() - timedelta(days=7)).isoformat() + 'Z'
             
-            for keyword in keywords:
-                params = {
-                    'part': 'snippet,statistics',
-                    'q': keyword,
-                    'type': 'video',
-                    'order': 'viewCount',
-                    'publishedAfter': (datetime.utcnow() - timedelta(days=7)).isoformat() + 'Z',
-                    'maxResults': max_results,
-                    'key': settings.YOUTUBE_API_KEY
-                }
-                
-                async with self.session.get(
-                    'https://www.googleapis.com/youtube/v3/search',
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        videos = self._parse_youtube_response(data, keyword)
-                        results.extend(videos)
+            responses = await self._request_each(
+                'GET',
+                'https://www.googleapis.com/youtube/v3/search',
+                [
+                    {
+                        'params': {
+                            'part': 'snippet,statistics',
+                            'q': keyword,
+                            'type': 'video',
+                            'order': 'viewCount',
+                            'publishedAfter': published_after,
+                            'maxResults': max_results,
+                            'key': settings.YOUTUBE_API_KEY
+                        }
+                    }
+                    for keyword in keywords
+                ]
+            )
+            
+            results = []
+            for data, keyword in zip(responses, keywords):
+                if data is not None:
+                    results.extend(self._parse_youtube_response(data, keyword))
             
             logger.info(f"Fetched {len(results)} YouTube trends")
             return results
@@ -78,30 +115,32 @@ class NovaConnector:
     ) -> List[Dict]:
         """Fetch trending products from TikTok"""
         try:
-            results = []
-            
             headers = {
                 'Authorization': f'Bearer {settings.TIKTOK_CLIENT_KEY}',
                 'Content-Type': 'application/json'
             }
             
-            for hashtag in hashtags:
-                payload = {
-                    'query': {
-                        'hashtag': hashtag,
-                        'max_count': max_results
+            responses = await self._request_each(
+                'POST',
+                'https://open-api.tiktok.com/research/query/',
+                [
+                    {
+                        'headers': headers,
+                        'json': {
+                            'query': {
+                                'hashtag': hashtag,
+                                'max_count': max_results
+                            }
+                        }
                     }
-                }
-                
-                async with self.session.post(
-                    'https://open-api.tiktok.com/research/query/',
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        videos = self._parse_tiktok_response(data, hashtag)
-                        results.extend(videos)
+                    for hashtag in hashtags
+                ]
+            )
+            
+            results = []
+            for data, hashtag in zip(responses, hashtags):
+                if data is not None:
+                    results.extend(self._parse_tiktok_response(data, hashtag))
             
             logger.info(f"Fetched {len(results)} TikTok trends")
             return results
@@ -116,27 +155,28 @@ class NovaConnector:
     ) -> List[Dict]:
         """Fetch trending products from Instagram"""
         try:
-            results = []
+            responses = await self._request_each(
+                'GET',
+                'https://graph.instagram.com/ig_hashtag_search',
+                [
+                    {
+                        'params': {
+                            'q': hashtag,
+                            'type': 'hashtag',
+                            'access_token': settings.INSTAGRAM_ACCESS_TOKEN
+                        }
+                    }
+                    for hashtag in hashtags
+                ]
+            )
             
-            for hashtag in hashtags:
-                params = {
-                    'q': hashtag,
-                    'type': 'hashtag',
-                    'access_token': settings.INSTAGRAM_ACCESS_TOKEN
-                }
-                
-                async with self.session.get(
-                    f'https://graph.instagram.com/ig_hashtag_search',
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Get top posts for this hashtag
-                        if data.get('data'):
-                            hashtag_id = data['data'][0]['id']
-                            posts = await self._fetch_instagram_hashtag_posts(hashtag_id)
-                            results.extend(posts)
+            # Get top posts for each hashtag found
+            hashtag_ids = [data['data'][0]['id'] for data in responses if data and data.get('data')]
+            post_lists = await asyncio.gather(
+                *(self._fetch_instagram_hashtag_posts(hashtag_id) for hashtag_id in hashtag_ids)
+            )
+            
+            results = [post for posts in post_lists for post in posts]
             
             logger.info(f"Fetched {len(results)} Instagram trends")
             return results
@@ -157,14 +197,14 @@ class NovaConnector:
                 'access_token': settings.INSTAGRAM_ACCESS_TOKEN
             }
             
-            async with self.session.get(
+            data = await self._request_json(
+                'GET',
                 f'https://graph.instagram.com/{hashtag_id}/recent_media',
                 params=params
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_instagram_response(data)
-                return []
+            )
+            if data is not None:
+                return self._parse_instagram_response(data)
+            return []
                 
         except Exception as e:
             logger.error(f"Instagram posts fetch error: {str(e)}")
@@ -176,27 +216,29 @@ class NovaConnector:
     ) -> List[Dict]:
         """Fetch trending products from Pinterest"""
         try:
-            results = []
-            
             headers = {
                 'Authorization': f'Bearer {settings.PINTEREST_ACCESS_TOKEN}'
             }
             
-            for keyword in keywords:
-                params = {
-                    'query': keyword,
-                    'limit': 50
-                }
-                
-                async with self.session.get(
-                    'https://api.pinterest.com/v5/search/pins',
-                    headers=headers,
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        pins = self._parse_pinterest_response(data, keyword)
-                        results.extend(pins)
+            responses = await self._request_each(
+                'GET',
+                'https://api.pinterest.com/v5/search/pins',
+                [
+                    {
+                        'headers': headers,
+                        'params': {
+                            'query': keyword,
+                            'limit': 50
+                        }
+                    }
+                    for keyword in keywords
+                ]
+            )
+            
+            results = []
+            for data, keyword in zip(responses, keywords):
+                if data is not None:
+                    results.extend(self._parse_pinterest_response(data, keyword))
             
             logger.info(f"Fetched {len(results)} Pinterest trends")
             return results
@@ -220,14 +262,13 @@ class NovaConnector:
                 'fields': 'id,message,created_time,likes.summary(true),comments.summary(true),shares'
             }
             
-            async with self.session.get(
+            data = await self._request_json(
+                'GET',
                 'https://graph.facebook.com/v18.0/search',
                 params=params
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    posts = self._parse_meta_response(data)
-                    results.extend(posts)
+            )
+            if data is not None:
+                results.extend(self._parse_meta_response(data))
             
             logger.info(f"Fetched {len(results)} Meta trends")
             return results
@@ -263,6 +304,7 @@ class NovaConnector:
     def _parse_youtube_response(self, data: Dict, keyword: str) -> List[Dict]:
         """Parse YouTube API response"""
         results = []
+        fetched_at = datetime.utcnow().isoformat()
         
         for item in data.get('items', []):
             snippet = item.get('snippet', {})
@@ -279,7 +321,7 @@ class NovaConnector:
                     'published_at': snippet.get('publishedAt'),
                     'channel': snippet.get('channelTitle'),
                     'keyword': keyword,
-                    'fetched_at': datetime.utcnow().isoformat()
+                    'fetched_at': fetched_at
                 })
         
         return results
@@ -287,6 +329,7 @@ class NovaConnector:
     def _parse_tiktok_response(self, data: Dict, hashtag: str) -> List[Dict]:
         """Parse TikTok API response"""
         results = []
+        fetched_at = datetime.utcnow().isoformat()
         
         for video in data.get('data', {}).get('videos', []):
             results.append({
@@ -299,7 +342,7 @@ class NovaConnector:
                 'comments': video.get('comment_count', 0),
                 'hashtag': hashtag,
                 'created_at': video.get('create_time'),
-                'fetched_at': datetime.utcnow().isoformat()
+                'fetched_at': fetched_at
             })
         
         return results
@@ -307,6 +350,7 @@ class NovaConnector:
     def _parse_instagram_response(self, data: Dict) -> List[Dict]:
         """Parse Instagram API response"""
         results = []
+        fetched_at = datetime.utcnow().isoformat()
         
         for post in data.get('data', []):
             results.append({
@@ -317,7 +361,7 @@ class NovaConnector:
                 'likes': post.get('like_count', 0),
                 'comments': post.get('comments_count', 0),
                 'timestamp': post.get('timestamp'),
-                'fetched_at': datetime.utcnow().isoformat()
+                'fetched_at': fetched_at
             })
         
         return results
@@ -325,6 +369,7 @@ class NovaConnector:
     def _parse_pinterest_response(self, data: Dict, keyword: str) -> List[Dict]:
         """Parse Pinterest API response"""
         results = []
+        fetched_at = datetime.utcnow().isoformat()
         
         for pin in data.get('items', []):
             results.append({
@@ -336,7 +381,7 @@ class NovaConnector:
                 'url': pin.get('link'),
                 'saves': pin.get('save_count', 0),
                 'keyword': keyword,
-                'fetched_at': datetime.utcnow().isoformat()
+                'fetched_at': fetched_at
             })
         
         return results
@@ -344,6 +389,7 @@ class NovaConnector:
     def _parse_meta_response(self, data: Dict) -> List[Dict]:
         """Parse Meta/Facebook API response"""
         results = []
+        fetched_at = datetime.utcnow().isoformat()
         
         for post in data.get('data', []):
             likes = post.get('likes', {}).get('summary', {}).get('total_count', 0)
@@ -359,7 +405,7 @@ class NovaConnector:
                 'shares': shares,
                 'engagement': likes + comments + shares,
                 'created_at': post.get('created_time'),
-                'fetched_at': datetime.utcnow().isoformat()
+                'fetched_at': fetched_at
             })
         
         return results
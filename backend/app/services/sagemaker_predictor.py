@@ -3,29 +3,58 @@ backend/app/services/sagemaker_predictor.py
 SageMaker ML model for trend prediction
 """
 
-import json
+import orjson
 import boto3
+import asyncio
+import hashlib
 import numpy as np
-from typing import Dict, List
+from bisect import bisect_left
+from botocore.config import Config
+from functools import lru_cache
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from app.config import get_settings
 from app.utils.logger import get_logger
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Trend direction labels, separated by score thresholds
+DIRECTION_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+DIRECTION_LABELS = ('strongly_declining', 'declining', 'stable', 'rising', 'strongly_rising')
+
+
+@lru_cache()
+def _sagemaker_client():
+    """Get the process-wide SageMaker runtime client with a pooled keep-alive connection"""
+    return boto3.client(
+        'sagemaker-runtime',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=Config(
+            max_pool_connections=64,
+            tcp_keepalive=True,
+            retries={'max_attempts': 2, 'mode': 'adaptive'}
+        )
+    )
+
 
 class SageMakerPredictor:
     """Service for SageMaker trend predictions"""
     
+    # Max products sent in a single batch endpoint invocation
+    MAX_INSTANCES_PER_CALL = 256
+    # Max number of cached batch predictions
+    CACHE_SIZE = 4096
+    
     def __init__(self):
-        self.sagemaker_runtime = boto3.client(
-            'sagemaker-runtime',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        self.sagemaker_runtime = _sagemaker_client()
         self.endpoint_name = settings.SAGEMAKER_ENDPOINT_NAME
+        # Bounds concurrent endpoint invocations across all batches
+        self._semaphore = asyncio.Semaphore(settings.SAGEMAKER_MAX_CONCURRENCY)
+        self._prediction_cache = TTLCache(self.CACHE_SIZE, settings.SAGEMAKER_PREDICTION_CACHE_TTL)
     
     async def predict_trend(
         self,
@@ -40,14 +69,9 @@ class SageMakerPredictor:
             input_data = self._prepare_input(features, time_series_data)
             
             # Invoke endpoint
-            response = self.sagemaker_runtime.invoke_endpoint(
-                EndpointName=self.endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(input_data)
-            )
+            result = await self._invoke(input_data)
             
             # Parse prediction
-            result = json.loads(response['Body'].read().decode())
             prediction = self._parse_prediction(result)
             
             logger.info(f"SageMaker prediction completed: {prediction.get('trend_direction')}")
@@ -63,23 +87,80 @@ class SageMakerPredictor:
     ) -> List[Dict]:
         """
         Batch prediction for multiple products
+        
+        Products are sent to the endpoint as one 'instances' payload per
+        MAX_INSTANCES_PER_CALL products, with chunks invoked concurrently.
+        Products in a chunk whose invocation fails get fallback predictions.
         """
+        chunk_size = self.MAX_INSTANCES_PER_CALL
+        chunks = [products[i:i + chunk_size] for i in range(0, len(products), chunk_size)]
+        
+        results = await asyncio.gather(
+            *(self._predict_chunk(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
         predictions = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Batch prediction error for {len(chunk)} products: {str(result)}")
+                result = [
+                    dict(self._get_fallback_prediction(), product_id=product.get('id'))
+                    for product in chunk
+                ]
+            predictions.extend(result)
+        
+        return predictions
+    
+    async def _predict_chunk(self, products: List[Dict]) -> List[Dict]:
+        """
+        Predict trends for products with a single endpoint invocation
         
+        Products whose features and history match a recent prediction, or
+        another product in the chunk, reuse it instead of being sent again.
+        """
+        # One clock reading for every product in the chunk
+        now = datetime.utcnow()
+        timestamp = now.isoformat()
+        
+        keys = []
+        parsed = {}
+        pending = {}
         for product in products:
-            try:
-                features = self._extract_features(product)
-                time_series = product.get('historical_scores', [])
-                
-                prediction = await self.predict_trend(features, time_series)
-                prediction['product_id'] = product.get('id')
-                predictions.append(prediction)
-                
-            except Exception as e:
-                logger.error(f"Batch prediction error for {product.get('id')}: {str(e)}")
+            features = self._extract_features(product, now)
+            time_series = product.get('historical_scores', [])
+            key = self._prediction_key(features, time_series)
+            keys.append(key)
+            
+            if key in parsed or key in pending:
                 continue
+            cached = self._prediction_cache.get(key)
+            if cached is not None:
+                parsed[key] = cached
+            else:
+                pending[key] = self._prepare_input(features, time_series, timestamp)
         
-        return predictions
+        if pending:
+            result = await self._invoke({'instances': list(pending.values())})
+            
+            # Predictions are returned in instance order
+            returned = len(result.get('predictions', ()))
+            if returned != len(pending):
+                raise ValueError(f"Expected {len(pending)} predictions, got {returned}")
+            
+            for i, key in enumerate(pending):
+                parsed[key] = self._parse_prediction(result, i)
+                self._prediction_cache.set(key, parsed[key])
+        
+        return [
+            dict(parsed[key], product_id=product.get('id'))
+            for product, key in zip(products, keys)
+        ]
+    
+    def _prediction_key(self, features: Dict, time_series: List[float]) -> bytes:
+        """Hash the model inputs that determine a prediction"""
+        canonical = orjson.dumps([features, time_series[-30:]], option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(canonical, digest_size=16).digest()
     
     async def forecast_demand(
         self,
@@ -97,13 +178,7 @@ class SageMakerPredictor:
                 'forecast_horizon': days_ahead
             }
             
-            response = self.sagemaker_runtime.invoke_endpoint(
-                EndpointName=self.endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(input_data)
-            )
-            
-            result = json.loads(response['Body'].read().decode())
+            result = await self._invoke(input_data)
             
             return {
                 'product_id': product_id,
@@ -117,10 +192,24 @@ class SageMakerPredictor:
             logger.error(f"Demand forecast error: {str(e)}")
             return {'error': str(e)}
     
+    async def _invoke(self, payload: Dict) -> Dict:
+        """Invoke the endpoint in a worker thread, bounded by the shared semaphore"""
+        async with self._semaphore:
+            return await asyncio.to_thread(self._invoke_sync, payload)
+    
+    def _invoke_sync(self, payload: Dict) -> Dict:
+        response = self.sagemaker_runtime.invoke_endpoint(
+            EndpointName=self.endpoint_name,
+            ContentType='application/json',
+            Body=orjson.dumps(payload)
+        )
+        return orjson.loads(response['Body'].read())
+    
     def _prepare_input(
         self,
         features: Dict,
-        time_series: List[float]
+        time_series: List[float],
+        timestamp: Optional[str] = None
     ) -> Dict:
         """Prepare input for SageMaker"""
         return {
@@ -133,13 +222,14 @@ class SageMakerPredictor:
                 'rating': features.get('rating', 0),
                 'days_trending': features.get('days_trending', 0)
             },
-            'time_series': time_series[-30:] if len(time_series) > 30 else time_series,
-            'timestamp': datetime.utcnow().isoformat()
+            'time_series': time_series[-30:],
+            'timestamp': timestamp or datetime.utcnow().isoformat()
         }
     
-    def _extract_features(self, product: Dict) -> Dict:
-        """Extract features from product data"""
+    def _extract_features(self, product: Dict, now: Optional[datetime] = None) -> Dict:
+        """Extract features from product data, with days trending counted up to now"""
         metrics = product.get('aggregated_metrics', {})
+        first_seen = product.get('first_seen')
         
         return {
             'engagement_rate': metrics.get('total_engagement', 0) / max(metrics.get('total_views', 1), 1),
@@ -148,40 +238,38 @@ class SageMakerPredictor:
             'price': product.get('price', 0),
             'review_count': metrics.get('total_reviews', 0),
             'rating': metrics.get('avg_rating', 0),
-            'days_trending': (datetime.utcnow() - datetime.fromisoformat(
-                product.get('first_seen', datetime.utcnow().isoformat())
-            )).days
+            'days_trending': (
+                ((now or datetime.utcnow()) - datetime.fromisoformat(first_seen)).days
+                if first_seen else 0
+            )
         }
     
-    def _parse_prediction(self, result: Dict) -> Dict:
-        """Parse SageMaker prediction result"""
-        predictions = result.get('predictions', [0.5])[0]
+    def _parse_prediction(self, result: Dict, index: int = 0) -> Dict:
+        """Parse the prediction at index of a SageMaker prediction result"""
+        predictions = result.get('predictions', [0.5])[index]
         
         if isinstance(predictions, list):
             trend_score = predictions[0]
         else:
             trend_score = predictions
         
+        # Batch results may carry one confidence per instance
+        confidence = result.get('confidence', 0.5)
+        if isinstance(confidence, list):
+            confidence = confidence[index]
+        
         return {
             'trend_score': float(trend_score),
             'trend_direction': self._determine_direction(trend_score),
-            'confidence': result.get('confidence', 0.5),
+            'confidence': confidence,
             'predicted_at': datetime.utcnow().isoformat(),
             'model_version': result.get('model_version', '1.0')
         }
     
     def _determine_direction(self, score: float) -> str:
         """Determine trend direction from score"""
-        if score > 0.8:
-            return 'strongly_rising'
-        elif score > 0.6:
-            return 'rising'
-        elif score > 0.4:
-            return 'stable'
-        elif score > 0.2:
-            return 'declining'
-        else:
-            return 'strongly_declining'
+        # Number of thresholds strictly below the score picks the label
+        return DIRECTION_LABELS[bisect_left(DIRECTION_THRESHOLDS, score)]
     
     def _calculate_stock_recommendation(self, forecast_result: Dict) -> int:
         """Calculate recommended stock based on forecast"""
@@ -189,8 +277,9 @@ class SageMakerPredictor:
         if not predictions:
             return 0
         
-        avg_demand = np.mean(predictions)
-        peak_demand = max(predictions)
+        demand = np.asarray(predictions, dtype=np.float64)
+        avg_demand = demand.mean()
+        peak_demand = demand.max()
         
         # Safety stock = 1.5 * average + buffer for peak
         recommended = int(avg_demand * 1.5 + (peak_demand - avg_demand) * 0.5)
@@ -202,7 +291,8 @@ class SageMakerPredictor:
         if not predictions:
             return None
         
-        peak_index = predictions.index(max(predictions))
+        # argmax returns the first peak, like list.index(max(...))
+        peak_index = int(np.argmax(predictions))
         peak_date = datetime.utcnow() + timedelta(days=peak_index)
         
         return peak_date.isoformat()
@@ -5,6 +5,7 @@ Strands SDK integration for sales data ingestion
 
 import aiohttp
 import asyncio
+import orjson
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from app.config import get_settings
@@ -21,6 +22,27 @@ class StrandsIngestionService:
         self.api_key = settings.STRANDS_API_KEY
         self.workspace_id = settings.STRANDS_WORKSPACE_ID
         self.base_url = "https://api.strands.com/v1"
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled HTTP session shared by all ingestion calls, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=64,
+                    limit_per_host=16,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                json_serialize=lambda obj: orjson.dumps(obj).decode()
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
     
     async def ingest_amazon_sales(
         self,
@@ -29,31 +51,32 @@ class StrandsIngestionService:
     ) -> List[Dict]:
         """Ingest Amazon sales data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                }
-                
-                payload = {
-                    'workspace_id': self.workspace_id,
-                    'source': 'amazon',
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'metrics': ['sales', 'revenue', 'units_sold', 'views']
-                }
-                
-                async with session.post(
-                    f'{self.base_url}/data/ingest',
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_sales_data(data)
-                    else:
-                        logger.error(f"Amazon sales ingestion failed: {response.status}")
-                        return []
+            session = await self._get_session()
+            
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            }
+            
+            payload = {
+                'workspace_id': self.workspace_id,
+                'source': 'amazon',
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'metrics': ['sales', 'revenue', 'units_sold', 'views']
+            }
+            
+            async with session.post(
+                f'{self.base_url}/data/ingest',
+                headers=headers,
+                json=payload
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return self._parse_sales_data(data)
+                else:
+                    logger.error(f"Amazon sales ingestion failed: {response.status}")
+                    return []
         
         except Exception as e:
             logger.error(f"Error ingesting Amazon sales: {str(e)}")
@@ -66,27 +89,28 @@ class StrandsIngestionService:
     ) -> List[Dict]:
         """Ingest Walmart sales data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'WM_SVC.NAME': 'Walmart Marketplace',
-                    'WM_QOS.CORRELATION_ID': str(datetime.utcnow().timestamp()),
-                    'WM_SEC.ACCESS_TOKEN': settings.WALMART_API_KEY
-                }
-                
-                params = {
-                    'startDate': start_date.strftime('%Y-%m-%d'),
-                    'endDate': end_date.strftime('%Y-%m-%d')
-                }
-                
-                async with session.get(
-                    'https://marketplace.walmartapis.com/v3/insights/items',
-                    headers=headers,
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_walmart_data(data)
-                    return []
+            session = await self._get_session()
+            
+            headers = {
+                'WM_SVC.NAME': 'Walmart Marketplace',
+                'WM_QOS.CORRELATION_ID': str(datetime.utcnow().timestamp()),
+                'WM_SEC.ACCESS_TOKEN': settings.WALMART_API_KEY
+            }
+            
+            params = {
+                'startDate': start_date.strftime('%Y-%m-%d'),
+                'endDate': end_date.strftime('%Y-%m-%d')
+            }
+            
+            async with session.get(
+                'https://marketplace.walmartapis.com/v3/insights/items',
+                headers=headers,
+                params=params
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return self._parse_walmart_data(data)
+                return []
         
         except Exception as e:
             logger.error(f"Error ingesting Walmart sales: {str(e)}")
@@ -99,26 +123,27 @@ class StrandsIngestionService:
     ) -> List[Dict]:
         """Ingest eBay sales data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'Bearer {settings.EBAY_APP_ID}',
-                    'Content-Type': 'application/json'
-                }
-                
-                params = {
-                    'filter': f'lastModifiedDate:[{start_date.isoformat()}..{end_date.isoformat()}]',
-                    'fieldgroups': 'COMPACT'
-                }
-                
-                async with session.get(
-                    'https://api.ebay.com/sell/inventory/v1/inventory_item',
-                    headers=headers,
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_ebay_data(data)
-                    return []
+            session = await self._get_session()
+            
+            headers = {
+                'Authorization': f'Bearer {settings.EBAY_APP_ID}',
+                'Content-Type': 'application/json'
+            }
+            
+            params = {
+                'filter': f'lastModifiedDate:[{start_date.isoformat()}..{end_date.isoformat()}]',
+                'fieldgroups': 'COMPACT'
+            }
+            
+            async with session.get(
+                'https://api.ebay.com/sell/inventory/v1/inventory_item',
+                headers=headers,
+                params=params
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return self._parse_ebay_data(data)
+                return []
         
         except Exception as e:
             logger.error(f"Error ingesting eBay sales: {str(e)}")
@@ -131,27 +156,28 @@ class StrandsIngestionService:
     ) -> List[Dict]:
         """Ingest Etsy sales data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'x-api-key': settings.ETSY_API_KEY,
-                    'Content-Type': 'application/json'
-                }
-                
-                params = {
-                    'min_created': int(start_date.timestamp()),
-                    'max_created': int(end_date.timestamp()),
-                    'limit': 100
-                }
-                
-                async with session.get(
-                    'https://openapi.etsy.com/v3/application/shops/receipts',
-                    headers=headers,
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_etsy_data(data)
-                    return []
+            session = await self._get_session()
+            
+            headers = {
+                'x-api-key': settings.ETSY_API_KEY,
+                'Content-Type': 'application/json'
+            }
+            
+            params = {
+                'min_created': int(start_date.timestamp()),
+                'max_created': int(end_date.timestamp()),
+                'limit': 100
+            }
+            
+            async with session.get(
+                'https://openapi.etsy.com/v3/application/shops/receipts',
+                headers=headers,
+                params=params
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return self._parse_etsy_data(data)
+                return []
         
         except Exception as e:
             logger.error(f"Error ingesting Etsy sales: {str(e)}")
@@ -164,26 +190,27 @@ class StrandsIngestionService:
     ) -> List[Dict]:
         """Ingest Target sales data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'Bearer {settings.TARGET_API_KEY}',
-                    'Content-Type': 'application/json'
-                }
-                
-                payload = {
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat()
-                }
-                
-                async with session.post(
-                    'https://api.target.com/products/v1/sales',
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_target_data(data)
-                    return []
+            session = await self._get_session()
+            
+            headers = {
+                'Authorization': f'Bearer {settings.TARGET_API_KEY}',
+                'Content-Type': 'application/json'
+            }
+            
+            payload = {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat()
+            }
+            
+            async with session.post(
+                'https://api.target.com/products/v1/sales',
+                headers=headers,
+                json=payload
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return self._parse_target_data(data)
+                return []
         
         except Exception as e:
             logger.error(f"Error ingesting Target sales: {str(e)}")
@@ -197,23 +224,32 @@ class StrandsIngestionService:
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days_back)
         
-        tasks = [
-            self.ingest_amazon_sales(start_date, end_date),
-            self.ingest_walmart_sales(start_date, end_date),
-            self.ingest_ebay_sales(start_date, end_date),
-            self.ingest_etsy_sales(start_date, end_date),
-            self.ingest_target_sales(start_date, end_date)
-        ]
+        sources = {
+            'amazon': self.ingest_amazon_sales,
+            'walmart': self.ingest_walmart_sales,
+            'ebay': self.ingest_ebay_sales,
+            'etsy': self.ingest_etsy_sales,
+            'target': self.ingest_target_sales
+        }
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async with asyncio.TaskGroup() as tg:
+            tasks = {
+                platform: tg.create_task(self._ingest_with_timeout(platform, ingest(start_date, end_date)))
+                for platform, ingest in sources.items()
+            }
         
-        return {
-            'amazon': results[0] if not isinstance(results[0], Exception) else [],
-            'walmart': results[1] if not isinstance(results[1], Exception) else [],
-            'ebay': results[2] if not isinstance(results[2], Exception) else [],
-            'etsy': results[3] if not isinstance(results[3], Exception) else [],
-            'target': results[4] if not isinstance(results[4], Exception) else []
-        }
+        return {platform: task.result() for platform, task in tasks.items()}
+    
+    async def _ingest_with_timeout(self, platform: str, ingestion) -> List[Dict]:
+        """Await one platform's ingestion, giving up after INGESTION_TIMEOUT seconds"""
+        try:
+            return await asyncio.wait_for(ingestion, timeout=settings.INGESTION_TIMEOUT)
+        except TimeoutError:
+            logger.error(f"{platform} sales ingestion timed out")
+            return []
+        except Exception as e:
+            logger.error(f"Error ingesting {platform} sales: {str(e)}")
+            return []
     
     def _parse_sales_data(self, data: Dict) -> List[Dict]:
         """Parse Strands API response"""
@@ -236,6 +272,7 @@ class StrandsIngestionService:
     def _parse_walmart_data(self, data: Dict) -> List[Dict]:
         """Parse Walmart API response"""
         results = []
+        timestamp = datetime.utcnow().isoformat()
         
         for item in data.get('elements', []):
             results.append({
@@ -245,7 +282,7 @@ class StrandsIngestionService:
                 'revenue': item.get('orderedRevenue', 0),
                 'views': item.get('pageViews', 0),
                 'platform': 'walmart',
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp
             })
         
         return results
@@ -253,6 +290,7 @@ class StrandsIngestionService:
     def _parse_ebay_data(self, data: Dict) -> List[Dict]:
         """Parse eBay API response"""
         results = []
+        timestamp = datetime.utcnow().isoformat()
         
         for item in data.get('inventoryItems', []):
             results.append({
@@ -261,7 +299,7 @@ class StrandsIngestionService:
                 'available_quantity': item.get('availability', {}).get('shipToLocationAvailability', {}).get('quantity', 0),
                 'price': item.get('product', {}).get('aspects', {}).get('price', 0),
                 'platform': 'ebay',
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp
             })
         
         return results
@@ -286,6 +324,7 @@ class StrandsIngestionService:
     def _parse_target_data(self, data: Dict) -> List[Dict]:
         """Parse Target API response"""
         results = []
+        timestamp = datetime.utcnow().isoformat()
         
         for item in data.get('products', []):
             results.append({
@@ -294,7 +333,7 @@ class StrandsIngestionService:
                 'sales': item.get('units_sold', 0),
                 'revenue': item.get('revenue', 0),
                 'platform': 'target',
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': timestamp
             })
         
         return results
@@ -5,5 +5,6 @@ Utilities package
 
 from .logger import get_logger
 from .metrics import MetricsCollector
+from .cache import cached
 
-__all__ = ["get_logger", "MetricsCollector"]
+__all__ = ["get_logger", "MetricsCollector", "cached"]
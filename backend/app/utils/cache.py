@@ -0,0 +1,231 @@
+"""
+backend/app/utils/cache.py
+Redis-backed response caching
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+import redis.asyncio as redis
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from app.config import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+CACHE_PREFIX = "trr"
+
+_KEY_TYPES = (str, int, float, bool, list, tuple, Enum, type(None))
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Get cached async Redis client"""
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def close_redis():
+    """Close the shared Redis client"""
+    if get_redis.cache_info().currsize:
+        await get_redis().close()
+        get_redis.cache_clear()
+
+
+def build_cache_key(namespace: str, **params) -> str:
+    """Build a cache key from a namespace and call parameters"""
+    # Injected dependencies (services, requests) are not part of the key
+    key_params = {k: v for k, v in params.items() if isinstance(v, _KEY_TYPES)}
+    digest = hashlib.sha1(
+        json.dumps(jsonable_encoder(key_params), sort_keys=True).encode()
+    ).hexdigest()
+    return f"{CACHE_PREFIX}:{namespace}:{digest}"
+
+
+async def get_raw(key: str) -> Optional[str]:
+    """Get a cached JSON string, or None on miss or cache failure"""
+    try:
+        return await get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+
+async def set_raw(key: str, value, expire: int):
+    """Store a JSON string with a TTL in seconds"""
+    try:
+        await get_redis().set(key, value, ex=expire)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def get_cached(key: str) -> Optional[Any]:
+    """Get a cached JSON value, or None on miss or cache failure"""
+    value = await get_raw(key)
+    return json.loads(value) if value is not None else None
+
+
+async def set_cached(key: str, value: Any, expire: int):
+    """Store a value as JSON with a TTL in seconds"""
+    await set_raw(key, json.dumps(jsonable_encoder(value)), expire)
+
+
+def _tag_key(tag: str) -> str:
+    return f"{CACHE_PREFIX}:tag:{tag}"
+
+
+async def tag_keys(key: str, tags: Iterable[str], expire: int):
+    """
+    Record a cache key under tags so invalidate_tag can drop it
+    
+    expire should cover the longest-lived entry stored under the tags.
+    """
+    try:
+        pipe = get_redis().pipeline()
+        for tag in tags:
+            pipe.sadd(_tag_key(tag), key)
+            pipe.expire(_tag_key(tag), expire)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache tagging failed for {key}: {str(e)}")
+
+
+async def invalidate_tag(tag: str):
+    """Drop every cache entry recorded under a tag"""
+    try:
+        redis_client = get_redis()
+        keys = await redis_client.smembers(_tag_key(tag))
+        await redis_client.delete(_tag_key(tag), *keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for tag {tag}: {str(e)}")
+
+
+def cached(
+    namespace: str,
+    expire: Optional[int] = None,
+    should_cache: Optional[Callable[[Any], bool]] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    tag_expire: Optional[int] = None
+):
+    """
+    Cache an async endpoint's JSON response keyed on its parameters
+    
+    Hits are returned as raw JSON responses, skipping response_model
+    validation of content that was already validated when cached.
+    Results failing should_cache are returned but not stored. tags is
+    called with the endpoint's parameters, and the entry is recorded under
+    the returned tags for invalidate_tag, for tag_expire (default: the
+    entry TTL) seconds.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = build_cache_key(namespace, **kwargs)
+
+            body = await get_raw(key)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
+
+            result = await func(*args, **kwargs)
+            if should_cache is not None and not should_cache(result):
+                return result
+
+            if isinstance(result, Response):
+                body = result.body
+            else:
+                body = json.dumps(jsonable_encoder(result))
+            ttl = expire or settings.RESPONSE_CACHE_TTL
+            await set_raw(key, body, ttl)
+            if tags is not None:
+                await tag_keys(key, tags(**kwargs), tag_expire or ttl)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def has_results(result: Any) -> bool:
+    """
+    Whether an endpoint result holds any results, for cached's should_cache
+    
+    Empty results usually mean an upstream failure, so are not cached.
+    """
+    if isinstance(result, Response):
+        return result.body not in (b"[]", b"{}")
+    return bool(result)
+
+
+class TTLCache:
+    """Bounded in-process cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, tuple] = {}  # key -> (expires_at, value)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry, or default if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store an entry, evicting expired then oldest entries when full"""
+        if key not in self._data and len(self._data) >= self.maxsize:
+            now = time.monotonic()
+            for k in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[k]
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        """Drop all entries"""
+        self._data.clear()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        should_cache: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Get an entry, fetching and storing it on a miss
+
+        Concurrent misses for the same key share one in-flight fetch.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch, should_cache))
+            self._inflight[key] = task
+
+        # Shield the shared fetch from cancellation of any single caller
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, fetch, should_cache) -> Any:
+        try:
+            value = await fetch()
+            if should_cache is None or should_cache(value):
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+_MISSING = object()
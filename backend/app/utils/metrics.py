@@ -3,9 +3,14 @@ backend/app/utils/metrics.py
 CloudWatch metrics and monitoring
 """
 
+import time
 import boto3
+import asyncio
+from botocore.config import Config
+from collections import deque
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from app.config import get_settings
 from app.utils.logger import get_logger
 
@@ -13,17 +18,45 @@ logger = get_logger(__name__)
 settings = get_settings()
 
 
+@lru_cache()
+def _cloudwatch_client():
+    """Get the process-wide CloudWatch client with a pooled keep-alive connection"""
+    return boto3.client(
+        'cloudwatch',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=Config(
+            max_pool_connections=16,
+            tcp_keepalive=True,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        )
+    )
+
+
 class MetricsCollector:
-    """Collect and send metrics to CloudWatch"""
+    """
+    Collect and send metrics to CloudWatch
+    
+    Metrics are buffered in memory and sent in batches by run_flush_loop,
+    keeping CloudWatch I/O off the request path. Samples of the same metric
+    and dimensions within one flush are sent as a single statistic set.
+    """
+    
+    # Max samples held between flushes; the oldest are dropped beyond this
+    API_BUFFER_SIZE = 10_000
+    # Seconds between flushes of buffered metrics
+    FLUSH_INTERVAL = 1.0
+    # CloudWatch limit on datums per put_metric_data call
+    MAX_DATUMS_PER_CALL = 1000
     
     def __init__(self):
-        self.cloudwatch = boto3.client(
-            'cloudwatch',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        self.cloudwatch = _cloudwatch_client()
+        # Settings are frozen, so the flag is read once rather than per record
+        self.enabled = settings.METRICS_ENABLED
         self.namespace = settings.CLOUDWATCH_NAMESPACE
+        self._api_calls = deque(maxlen=self.API_BUFFER_SIZE)
+        self._samples = deque(maxlen=self.API_BUFFER_SIZE)
     
     def record_api_call(
         self,
@@ -32,36 +65,62 @@ class MetricsCollector:
         status_code: int
     ):
         """Record API call metrics"""
-        if not settings.METRICS_ENABLED:
+        if not self.enabled:
             return
         
+        self._api_calls.append((endpoint, duration_ms, status_code, time.time()))
+    
+    async def run_flush_loop(self):
+        """Periodically send buffered metrics until cancelled"""
         try:
-            self.cloudwatch.put_metric_data(
-                Namespace=self.namespace,
-                MetricData=[
-                    {
-                        'MetricName': 'APILatency',
-                        'Dimensions': [
-                            {'Name': 'Endpoint', 'Value': endpoint},
-                            {'Name': 'StatusCode', 'Value': str(status_code)}
-                        ],
-                        'Value': duration_ms,
-                        'Unit': 'Milliseconds',
-                        'Timestamp': datetime.utcnow()
-                    },
-                    {
-                        'MetricName': 'APICallCount',
-                        'Dimensions': [
-                            {'Name': 'Endpoint', 'Value': endpoint}
-                        ],
-                        'Value': 1,
-                        'Unit': 'Count',
-                        'Timestamp': datetime.utcnow()
-                    }
-                ]
+            while True:
+                await asyncio.sleep(self.FLUSH_INTERVAL)
+                await self.flush()
+        finally:
+            await self.flush()
+    
+    async def flush(self):
+        """Send all buffered metrics to CloudWatch"""
+        # (metric name, dimensions, unit) -> [count, sum, min, max, latest epoch timestamp]
+        stats: Dict[Tuple, List] = {}
+        
+        while self._api_calls:
+            endpoint, duration_ms, status_code, timestamp = self._api_calls.popleft()
+            _add_sample(
+                stats, 'APILatency',
+                (('Endpoint', endpoint), ('StatusCode', str(status_code))),
+                'Milliseconds', duration_ms, timestamp
             )
-        except Exception as e:
-            logger.error(f"Failed to record API metrics: {str(e)}")
+            _add_sample(stats, 'APICallCount', (('Endpoint', endpoint),), 'Count', 1, timestamp)
+        
+        while self._samples:
+            _add_sample(stats, *self._samples.popleft())
+        
+        metric_data = [
+            {
+                'MetricName': name,
+                'Dimensions': [{'Name': k, 'Value': v} for k, v in dimensions],
+                'StatisticValues': {
+                    'SampleCount': count,
+                    'Sum': total,
+                    'Minimum': minimum,
+                    'Maximum': maximum
+                },
+                'Unit': unit,
+                'Timestamp': datetime.utcfromtimestamp(timestamp)
+            }
+            for (name, dimensions, unit), (count, total, minimum, maximum, timestamp) in stats.items()
+        ]
+        
+        for i in range(0, len(metric_data), self.MAX_DATUMS_PER_CALL):
+            try:
+                await asyncio.to_thread(
+                    self.cloudwatch.put_metric_data,
+                    Namespace=self.namespace,
+                    MetricData=metric_data[i:i + self.MAX_DATUMS_PER_CALL]
+                )
+            except Exception as e:
+                logger.error(f"Failed to send metrics: {str(e)}")
     
     def record_trend_analysis(
         self,
@@ -70,35 +129,13 @@ class MetricsCollector:
         processing_time_ms: float
     ):
         """Record trend analysis metrics"""
-        if not settings.METRICS_ENABLED:
+        if not self.enabled:
             return
         
-        try:
-            self.cloudwatch.put_metric_data(
-                Namespace=self.namespace,
-                MetricData=[
-                    {
-                        'MetricName': 'ProductsAnalyzed',
-                        'Value': product_count,
-                        'Unit': 'Count',
-                        'Timestamp': datetime.utcnow()
-                    },
-                    {
-                        'MetricName': 'AverageTrendScore',
-                        'Value': avg_score,
-                        'Unit': 'None',
-                        'Timestamp': datetime.utcnow()
-                    },
-                    {
-                        'MetricName': 'AnalysisProcessingTime',
-                        'Value': processing_time_ms,
-                        'Unit': 'Milliseconds',
-                        'Timestamp': datetime.utcnow()
-                    }
-                ]
-            )
-        except Exception as e:
-            logger.error(f"Failed to record trend analysis metrics: {str(e)}")
+        timestamp = time.time()
+        self._samples.append(('ProductsAnalyzed', (), 'Count', product_count, timestamp))
+        self._samples.append(('AverageTrendScore', (), 'None', avg_score, timestamp))
+        self._samples.append(('AnalysisProcessingTime', (), 'Milliseconds', processing_time_ms, timestamp))
     
     def record_platform_fetch(
         self,
@@ -107,32 +144,37 @@ class MetricsCollector:
         success: bool
     ):
         """Record platform data fetch metrics"""
-        if not settings.METRICS_ENABLED:
+        if not self.enabled:
             return
         
-        try:
-            self.cloudwatch.put_metric_data(
-                Namespace=self.namespace,
-                MetricData=[
-                    {
-                        'MetricName': 'PlatformFetchSuccess',
-                        'Dimensions': [
-                            {'Name': 'Platform', 'Value': platform}
-                        ],
-                        'Value': 1 if success else 0,
-                        'Unit': 'Count',
-                        'Timestamp': datetime.utcnow()
-                    },
-                    {
-                        'MetricName': 'ItemsFetched',
-                        'Dimensions': [
-                            {'Name': 'Platform', 'Value': platform}
-                        ],
-                        'Value': item_count,
-                        'Unit': 'Count',
-                        'Timestamp': datetime.utcnow()
-                    }
-                ]
-            )
-        except Exception as e:
-            logger.error(f"Failed to record platform fetch metrics: {str(e)}")
+        timestamp = time.time()
+        dimensions = (('Platform', platform),)
+        self._samples.append(('PlatformFetchSuccess', dimensions, 'Count', 1 if success else 0, timestamp))
+        self._samples.append(('ItemsFetched', dimensions, 'Count', item_count, timestamp))
+
+
+def _add_sample(
+    stats: Dict[Tuple, List],
+    name: str,
+    dimensions: Tuple,
+    unit: str,
+    value: float,
+    timestamp: float
+):
+    """Fold one sample into the statistic set of its metric series"""
+    key = (name, dimensions, unit)
+    entry = stats.get(key)
+    if entry is None:
+        stats[key] = [1, value, value, value, timestamp]
+    else:
+        entry[0] += 1
+        entry[1] += value
+        entry[2] = min(entry[2], value)
+        entry[3] = max(entry[3], value)
+        entry[4] = max(entry[4], timestamp)
+
+
+@lru_cache()
+def get_metrics_collector() -> MetricsCollector:
+    """Get the process-wide metrics collector flushed by the app's background loop"""
+    return MetricsCollector()
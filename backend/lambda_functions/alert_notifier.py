@@ -4,16 +4,62 @@ Lambda function to check alerts and send notifications
 """
 
 import json
+import re
 import boto3
 import os
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Tuple
 
-dynamodb = boto3.resource('dynamodb')
-ses = boto3.client('ses')
+# Shared by warm invocations; pool sized for the parallel scan threads
+boto_config = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+ses = boto3.client('ses', config=boto_config)
 
 alerts_table = os.environ.get('ALERTS_TABLE', 'TrendRadarAlerts')
 products_table = os.environ.get('PRODUCTS_TABLE', 'TrendRadarProducts')
 sender_email = os.environ.get('SENDER_EMAIL', 'noreply@trendradar.com')
+scan_segments = int(os.environ.get('SCAN_SEGMENTS', '4'))
+# Sparse GSI keyed on active_status = 'ACTIVE'; active alerts are scanned when unset
+alerts_active_index = os.environ.get('ALERTS_ACTIVE_INDEX', '')
+# SES template for bulk sends; emails are rendered and sent one by one when unset
+ses_template_name = os.environ.get('SES_TEMPLATE_NAME', '')
+
+# SES limit on destinations per send_bulk_templated_email call
+SES_BULK_LIMIT = 50
+# Max products listed in one notification
+EMAIL_PRODUCT_LIMIT = 10
+
+EMAIL_TEMPLATE = """
+    <html>
+    <head></head>
+    <body>
+        <h2>Shopping Trend Radar Alert</h2>
+        <p>The following products match your alert criteria:</p>
+        <ul>
+    {items}
+        </ul>
+        <p>Visit the dashboard for more details.</p>
+    </body>
+    </html>
+    """
+
+EMAIL_ITEM_TEMPLATE = """
+            <li>
+                <strong>{name}</strong><br>
+                Category: {category}<br>
+                Trend Score: {trend_score}<br>
+                Platforms: {platforms}<br>
+            </li>
+        """
 
 
 def lambda_handler(event, context):
@@ -22,27 +68,39 @@ def lambda_handler(event, context):
     Triggered periodically by EventBridge
     """
     try:
-        # Get all active alerts
-        alerts_tbl = dynamodb.Table(alerts_table)
-        alerts_response = alerts_tbl.scan(
-            FilterExpression='active = :active',
-            ExpressionAttributeValues={':active': True}
-        )
-        alerts = alerts_response.get('Items', [])
-        
-        # Get current trending products
-        products_tbl = dynamodb.Table(products_table)
-        products_response = products_tbl.scan()
-        products = products_response.get('Items', [])
+        # Scan active alerts and current trending products in parallel
+        with ThreadPoolExecutor(max_workers=2 * scan_segments) as executor:
+            if alerts_active_index:
+                alert_segments = [executor.submit(query_active_alerts)]
+            else:
+                alert_segments = parallel_scan(
+                    executor,
+                    alerts_table,
+                    FilterExpression='active = :active',
+                    ExpressionAttributeValues={':active': True}
+                )
+            product_segments = parallel_scan(executor, products_table)
+            
+            # Index each product segment as soon as its scan finishes
+            products, index = build_product_index(
+                segment.result() for segment in as_completed(product_segments)
+            )
+            alerts = [item for segment in alert_segments for item in segment.result()]
         
         # Check each alert
-        notifications_sent = 0
+        notifications = []
         for alert in alerts:
-            matched = check_alert(alert, products)
+            matched = check_alert(alert, products, index)
             
             if matched:
-                send_notification(alert, matched)
-                notifications_sent += 1
+                notifications.append((alert, matched))
+        
+        if ses_template_name:
+            notifications_sent = send_bulk_notifications(notifications)
+        else:
+            notifications_sent = sum(
+                send_notification(alert, matched) for alert, matched in notifications
+            )
         
         return {
             'statusCode': 200,
@@ -61,78 +119,202 @@ def lambda_handler(event, context):
         }
 
 
-def check_alert(alert: dict, products: list) -> list:
-    """Check if alert conditions are met"""
+def parallel_scan(executor: ThreadPoolExecutor, table_name: str, **scan_kwargs) -> list:
+    """Start a segmented scan of a table, returning one future per segment"""
+    return [
+        executor.submit(scan_segment, table_name, segment, scan_segments, **scan_kwargs)
+        for segment in range(scan_segments)
+    ]
+
+
+def scan_segment(table_name: str, segment: int, total_segments: int, **scan_kwargs) -> list:
+    """Scan all pages of one table segment"""
+    table = dynamodb.Table(table_name)
+    items = []
     
-    matched_products = []
+    while True:
+        response = table.scan(Segment=segment, TotalSegments=total_segments, **scan_kwargs)
+        items.extend(response.get('Items', []))
+        
+        if 'LastEvaluatedKey' not in response:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def query_active_alerts() -> list:
+    """Query all pages of active alerts from the sparse active alerts index"""
+    table = dynamodb.Table(alerts_table)
+    query_kwargs = {
+        'IndexName': alerts_active_index,
+        'KeyConditionExpression': Key('active_status').eq('ACTIVE')
+    }
+    items = []
+    
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        
+        if 'LastEvaluatedKey' not in response:
+            return items
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def build_product_index(batches: Iterable[list]) -> Tuple[list, dict]:
+    """
+    Collect products from batches of scanned items and index them
+    
+    Products are indexed by category and platform, with lowercased search
+    text. Batches are consumed as they arrive, so indexing overlaps scans
+    that are still running.
+    """
+    products = []
+    by_category = defaultdict(set)
+    by_platform = defaultdict(set)
+    texts = []
+    
+    for batch in batches:
+        for product in batch:
+            i = len(products)
+            products.append(product)
+            by_category[product.get('category')].add(i)
+            for platform in product.get('platforms', []):
+                by_platform[platform].add(i)
+            texts.append(f"{product.get('name', '')} {product.get('description', '')}".lower())
+    
+    return products, {
+        'by_category': by_category,
+        'by_platform': by_platform,
+        'texts': texts
+    }
+
+
+@lru_cache(maxsize=1024)
+def compile_keywords(keywords: tuple) -> re.Pattern:
+    """Compile a pattern matching any keyword in lowercased text, shared by alerts with the same keywords"""
+    return re.compile('|'.join(re.escape(kw.lower()) for kw in keywords))
+
+
+def check_alert(alert: dict, products: list, index: dict) -> list:
+    """Check if alert conditions are met"""
     
     keywords = alert.get('keywords', [])
     categories = alert.get('categories', [])
     min_score = alert.get('min_trend_score', 0.7)
     platforms = alert.get('platforms', [])
     
-    for product in products:
+    # Narrow candidates by category and platform before checking anything else
+    candidates = None
+    if categories:
+        candidates = set().union(*(index['by_category'].get(c, ()) for c in categories))
+    if platforms:
+        on_platforms = set().union(*(index['by_platform'].get(pl, ()) for pl in platforms))
+        candidates = on_platforms if candidates is None else candidates & on_platforms
+    
+    # Match all keywords in a single pass over each product's text
+    keyword_pattern = compile_keywords(tuple(sorted(keywords))) if keywords else None
+    
+    matched_products = []
+    texts = index['texts']
+    for i in (range(len(products)) if candidates is None else sorted(candidates)):
+        product = products[i]
+        
         # Check trend score
         if product.get('trend_score', 0) < min_score:
             continue
         
         # Check keywords
-        if keywords:
-            product_text = f"{product.get('name', '')} {product.get('description', '')}".lower()
-            if not any(kw.lower() in product_text for kw in keywords):
-                continue
-        
-        # Check categories
-        if categories and product.get('category') not in categories:
+        if keyword_pattern and not keyword_pattern.search(texts[i]):
             continue
         
-        # Check platforms
-        if platforms:
-            product_platforms = product.get('platforms', [])
-            if not any(pl in product_platforms for pl in platforms):
-                continue
-        
         matched_products.append(product)
     
     return matched_products
 
 
-def send_notification(alert: dict, matched_products: list):
-    """Send email notification"""
+def email_product_fields(matched_products: list) -> list:
+    """Format the matched products listed in a notification"""
+    return [
+        {
+            'name': str(product.get('name')),
+            'category': str(product.get('category')),
+            'trend_score': f"{product.get('trend_score', 0):.2f}",
+            'platforms': ', '.join(product.get('platforms', []))
+        }
+        for product in matched_products[:EMAIL_PRODUCT_LIMIT]
+    ]
+
+
+def send_bulk_notifications(notifications: list) -> int:
+    """
+    Send notifications through the SES template, up to SES_BULK_LIMIT per call
+    
+    SES reports failures per destination rather than raising, so only
+    destinations with a Success status are counted. Returns the number sent.
+    """
+    alert_ids = []
+    destinations = []
+    for alert, matched_products in notifications:
+        user_email = alert.get('user_email')
+        if not user_email:
+            print(f"No email for alert {alert.get('id')}")
+            continue
+        
+        alert_ids.append(alert.get('id'))
+        destinations.append({
+            'Destination': {'ToAddresses': [user_email]},
+            'ReplacementTemplateData': json.dumps({
+                'count': len(matched_products),
+                'products': email_product_fields(matched_products)
+            })
+        })
+    
+    sent = 0
+    for i in range(0, len(destinations), SES_BULK_LIMIT):
+        batch = destinations[i:i + SES_BULK_LIMIT]
+        try:
+            response = ses.send_bulk_templated_email(
+                Source=sender_email,
+                Template=ses_template_name,
+                DefaultTemplateData=json.dumps({'count': 0, 'products': []}),
+                Destinations=batch
+            )
+        
+        except Exception as e:
+            print(f"Error sending bulk email: {str(e)}")
+            continue
+        
+        # Statuses are returned in destination order
+        batch_sent = 0
+        for alert_id, status in zip(alert_ids[i:i + SES_BULK_LIMIT], response.get('Status', [])):
+            if status.get('Status') == 'Success':
+                batch_sent += 1
+            else:
+                print(f"Error sending email for alert {alert_id}: {status.get('Status')} {status.get('Error', '')}")
+        
+        print(f"Notifications sent to {batch_sent} of {len(batch)} recipients")
+        sent += batch_sent
+    
+    return sent
+
+
+def send_notification(alert: dict, matched_products: list) -> bool:
+    """Send email notification, returning whether it was sent"""
+    
+    if not matched_products:
+        return False
     
     user_email = alert.get('user_email')
     if not user_email:
         print(f"No email for alert {alert.get('id')}")
-        return
+        return False
     
     # Build email content
     subject = f"Trend Alert: {len(matched_products)} products match your criteria"
     
-    body_html = f"""
-    <html>
-    <head></head>
-    <body>
-        <h2>Shopping Trend Radar Alert</h2>
-        <p>The following products match your alert criteria:</p>
-        <ul>
-    """
-    
-    for product in matched_products[:10]:  # Limit to 10
-        body_html += f"""
-            <li>
-                <strong>{product.get('name')}</strong><br>
-                Category: {product.get('category')}<br>
-                Trend Score: {product.get('trend_score', 0):.2f}<br>
-                Platforms: {', '.join(product.get('platforms', []))}<br>
-            </li>
-        """
-    
-    body_html += """
-        </ul>
-        <p>Visit the dashboard for more details.</p>
-    </body>
-    </html>
-    """
+    body_html = EMAIL_TEMPLATE.format(items=''.join(
+        EMAIL_ITEM_TEMPLATE.format(**fields)
+        for fields in email_product_fields(matched_products)
+    ))
     
     try:
         ses.send_email(
@@ -144,6 +326,8 @@ def send_notification(alert: dict, matched_products: list):
             }
         )
         print(f"Notification sent to {user_email}")
+        return True
     
     except Exception as e:
         print(f"Error sending email: {str(e)}")
+        return False
@@ -3,15 +3,38 @@ backend/lambda_functions/dashboard_generator.py
 Lambda function to generate dashboards and store in S3
 """
 
+import gzip
+import io
 import json
 import boto3
 import os
+import time
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Tuple
 
-s3_client = boto3.client('s3')
+# Shared by warm invocations
+s3_client = boto3.client('s3', config=Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+))
 bucket_name = os.environ.get('S3_BUCKET_NAME', 'shopping-trend-radar-data')
 
+# Dashboards over the threshold are transferred as concurrent multipart parts or ranges
+MB = 1024 * 1024
+transfer_config = TransferConfig(
+    multipart_threshold=8 * MB,
+    multipart_chunksize=25 * MB,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Dashboards memoized across warm invocations: key -> (generated_at monotonic, dashboard)
+DASHBOARD_CACHE_TTL = 60.0
+_dashboard_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+
 
 def lambda_handler(event, context):
     """
@@ -24,17 +47,25 @@ def lambda_handler(event, context):
         categories = event.get('categories', [])
         
         # Generate dashboard data
-        dashboard_data = generate_dashboard(user_type, categories)
+        dashboard_data = get_dashboard(user_type, categories)
         
         # Upload to S3
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         key = f"dashboards/{user_type}/{timestamp}.json"
         
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=key,
-            Body=json.dumps(dashboard_data),
-            ContentType='application/json'
+        s3_client.upload_fileobj(
+            io.BytesIO(gzip.compress(
+                json.dumps(dashboard_data, separators=(',', ':')).encode(),
+                compresslevel=6
+            )),
+            bucket_name,
+            key,
+            ExtraArgs={
+                'ContentType': 'application/json',
+                'ContentEncoding': 'gzip',
+                'ChecksumAlgorithm': 'CRC32'
+            },
+            Config=transfer_config
         )
         
         return {
@@ -54,6 +85,28 @@ def lambda_handler(event, context):
         }
 
 
+def read_dashboard(key: str) -> Dict:
+    """Read a stored dashboard, with large objects fetched as concurrent ranged GETs"""
+    with io.BytesIO() as buffer:
+        s3_client.download_fileobj(bucket_name, key, buffer, Config=transfer_config)
+        # Objects are stored gzipped; S3 does not decode Content-Encoding
+        return json.loads(gzip.decompress(buffer.getvalue()))
+
+
+def get_dashboard(user_type: str, categories: list) -> Dict:
+    """Get dashboard data, reusing one generated within DASHBOARD_CACHE_TTL seconds"""
+    key = (user_type, tuple(sorted(categories)))
+    now = time.monotonic()
+    
+    cached = _dashboard_cache.get(key)
+    if cached is not None and now - cached[0] < DASHBOARD_CACHE_TTL:
+        return cached[1]
+    
+    dashboard = generate_dashboard(user_type, categories)
+    _dashboard_cache[key] = (now, dashboard)
+    return dashboard
+
+
 def generate_dashboard(user_type: str, categories: list) -> Dict:
     """Generate dashboard data"""
     
@@ -6,13 +6,35 @@ Lambda function for periodic trend analysis
 import json
 import boto3
 import os
+import random
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from decimal import Decimal
 
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
+# Shared by warm invocations; pool sized for the parallel scan and write threads
+boto_config = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+sns = boto3.client('sns', config=boto_config)
 
 table_name = os.environ.get('DYNAMODB_TABLE', 'TrendRadarProducts')
 sns_topic = os.environ.get('SNS_TOPIC_ARN', '')
+scan_segments = int(os.environ.get('SCAN_SEGMENTS', '8'))
+
+# Attributes read by the analysis; updates only touch the scored attributes
+SCAN_PROJECTION = {
+    'ProjectionExpression': 'id, #n, trend_score',
+    'ExpressionAttributeNames': {'#n': 'name'}
+}
+# Concurrent UpdateItem calls when writing scores back
+UPDATE_WORKERS = 16
+
+table = dynamodb.Table(table_name)
 
 
 def lambda_handler(event, context):
@@ -22,9 +44,12 @@ def lambda_handler(event, context):
     """
     try:
         # Get products from DynamoDB
-        table = dynamodb.Table(table_name)
-        response = table.scan()
-        products = response.get('Items', [])
+        products = parallel_scan(table_name)
+        
+        # DynamoDB numbers arrive as Decimal; score as floats
+        for product in products:
+            if 'trend_score' in product:
+                product['trend_score'] = float(product['trend_score'])
         
         # Analyze trends
         analysis_results = analyze_trends(products)
@@ -53,10 +78,36 @@ def lambda_handler(event, context):
         }
 
 
+def parallel_scan(table_name: str) -> list:
+    """Scan all pages of a table, with segments scanned in parallel"""
+    with ThreadPoolExecutor(max_workers=scan_segments) as executor:
+        segments = [
+            executor.submit(scan_segment, table_name, segment, scan_segments)
+            for segment in range(scan_segments)
+        ]
+        return [item for segment in segments for item in segment.result()]
+
+
+def scan_segment(table_name: str, segment: int, total_segments: int) -> list:
+    """Scan all pages of one table segment"""
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {'Segment': segment, 'TotalSegments': total_segments, **SCAN_PROJECTION}
+    items = []
+    
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        
+        if 'LastEvaluatedKey' not in response:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
 def analyze_trends(products: list) -> dict:
     """Analyze product trends"""
     
     significant_changes = []
+    analyzed_at = datetime.utcnow().isoformat()
     
     for product in products:
         old_score = product.get('trend_score', 0)
@@ -78,7 +129,7 @@ def analyze_trends(products: list) -> dict:
             })
         
         product['trend_score'] = new_score
-        product['last_analyzed'] = datetime.utcnow().isoformat()
+        product['last_analyzed'] = analyzed_at
     
     return {
         'products': products,
@@ -94,7 +145,6 @@ def calculate_new_score(product: dict) -> float:
     base_score = product.get('trend_score', 0.5)
     
     # Add some variation
-    import random
     variation = random.uniform(-0.1, 0.1)
     
     new_score = max(0, min(1, base_score + variation))
@@ -103,13 +153,35 @@ def calculate_new_score(product: dict) -> float:
 
 
 def update_products(table, analysis_results: dict):
-    """Update products in DynamoDB"""
+    """
+    Update product scores in DynamoDB
     
-    for product in analysis_results['products']:
+    Products are scanned with only the analyzed attributes, so scores are
+    written with UpdateItem rather than put back as whole items. Products
+    deleted since the scan are skipped instead of recreated as stubs.
+    """
+    
+    def update_product(product: dict):
         try:
-            table.put_item(Item=product)
+            table.update_item(
+                Key={'id': product['id']},
+                UpdateExpression='SET trend_score = :score, last_analyzed = :analyzed',
+                ConditionExpression='attribute_exists(id)',
+                ExpressionAttributeValues={
+                    ':score': Decimal(str(product['trend_score'])),
+                    ':analyzed': product['last_analyzed']
+                }
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                print(f"Skipping deleted product {product.get('id')}")
+            else:
+                print(f"Error updating product {product.get('id')}: {str(e)}")
         except Exception as e:
             print(f"Error updating product {product.get('id')}: {str(e)}")
+    
+    with ThreadPoolExecutor(max_workers=UPDATE_WORKERS) as executor:
+        list(executor.map(update_product, analysis_results['products']))
 
 
 def send_notifications(changes: list):
@@ -118,10 +190,10 @@ def send_notifications(changes: list):
     if not sns_topic or not changes:
         return
     
-    message = "Significant trend changes detected:\n\n"
-    
-    for change in changes[:10]:  # Limit to 10
-        message += f"- {change['product_name']}: {change['old_score']:.2f} → {change['new_score']:.2f}\n"
+    message = "Significant trend changes detected:\n\n" + "".join(
+        f"- {change['product_name']}: {change['old_score']:.2f} → {change['new_score']:.2f}\n"
+        for change in changes[:10]  # Limit to 10
+    )
     
     try:
         sns.publish(
@@ -192,12 +192,24 @@ resource "aws_dynamodb_table" "alerts" {
     type = "S"
   }
 
+  attribute {
+    name = "active_status"
+    type = "S"
+  }
+
   global_secondary_index {
     name            = "UserIdIndex"
     hash_key        = "user_id"
     projection_type = "ALL"
   }
 
+  # Sparse index: only alerts with active_status = ACTIVE are written to it
+  global_secondary_index {
+    name            = "ActiveIndex"
+    hash_key        = "active_status"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name = "trend-radar-alerts"
   }
@@ -12,6 +12,7 @@ sys.path.append(str(Path(__file__).parent.parent / 'backend'))
 
 from datetime import datetime, timedelta
 import random
+from collections import Counter
 from app.models.trends import Product, TrendStatus, PlatformMetrics
 
 # Sample product data
@@ -84,12 +85,13 @@ async def seed_database():
     print("🌱 Seeding database with sample data...")
     
     products = []
+    now = datetime.utcnow()
     
     for i, sample in enumerate(SAMPLE_PRODUCTS):
-        # Generate platform metrics
+        # Generate platform metrics, skipping validation of generated values
         platform_metrics = {}
         for platform in sample["platforms"]:
-            metrics = PlatformMetrics(
+            metrics = PlatformMetrics.model_construct(
                 platform=platform,
                 engagement_count=random.randint(10000, 500000),
                 views=random.randint(100000, 5000000),
@@ -98,7 +100,7 @@ async def seed_database():
                 comments=random.randint(500, 25000),
                 mentions=random.randint(100, 5000),
                 growth_rate=random.uniform(0.1, 0.9),
-                timestamp=datetime.utcnow()
+                timestamp=now
             )
             platform_metrics[platform] = metrics
         
@@ -118,8 +120,8 @@ async def seed_database():
         else:
             status = TrendStatus.STABLE
         
-        # Create product
-        product = Product(
+        # Create product; seed values are generated in range, so validation is skipped
+        product = Product.model_construct(
             id=f"product_{i+1}",
             name=sample["name"],
             category=sample["category"],
@@ -130,8 +132,8 @@ async def seed_database():
             viral_velocity=round(velocity, 2),
             status=status,
             platform_metrics=platform_metrics,
-            first_seen=datetime.utcnow() - timedelta(days=days_active),
-            last_updated=datetime.utcnow()
+            first_seen=now - timedelta(days=days_active),
+            last_updated=now
         )
         
         products.append(product)
@@ -139,12 +141,13 @@ async def seed_database():
     
     # In production, save to database here
     # For demo, just print summary
+    status_counts = Counter(p.status for p in products)
     print(f"\n✅ Successfully seeded {len(products)} products")
-    print(f"   - Emerging: {sum(1 for p in products if p.status == TrendStatus.EMERGING)}")
-    print(f"   - Rising: {sum(1 for p in products if p.status == TrendStatus.RISING)}")
-    print(f"   - Peak: {sum(1 for p in products if p.status == TrendStatus.PEAK)}")
-    print(f"   - Stable: {sum(1 for p in products if p.status == TrendStatus.STABLE)}")
-    print(f"   - Declining: {sum(1 for p in products if p.status == TrendStatus.DECLINING)}")
+    print(f"   - Emerging: {status_counts[TrendStatus.EMERGING]}")
+    print(f"   - Rising: {status_counts[TrendStatus.RISING]}")
+    print(f"   - Peak: {status_counts[TrendStatus.PEAK]}")
+    print(f"   - Stable: {status_counts[TrendStatus.STABLE]}")
+    print(f"   - Declining: {status_counts[TrendStatus.DECLINING]}")
 
 
 if __name__ == "__main__":
@@ -42,6 +42,7 @@ setup(
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.0",
             "pytest-cov>=4.1.0",
+            "fakeredis>=2.20.0",
             "black>=23.7.0",
             "flake8>=6.1.0",
             "mypy>=1.5.0",
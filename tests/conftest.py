@@ -0,0 +1,47 @@
+"""
+tests/conftest.py
+Shared test fixtures
+"""
+
+import pytest
+from fakeredis import FakeServer, aioredis
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.dependencies import get_aggregator, get_alert_store, get_alert_evaluator
+from app.services.alert_store import AlertStore
+from app.services.alert_evaluator import AlertEvaluator
+
+
+def _fake_alert_store(server: FakeServer) -> AlertStore:
+    """Alert store on an in-memory fake Redis holding the server's data"""
+    return AlertStore(aioredis.FakeRedis(server=server, decode_responses=True))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    API test client shared by the whole test session
+    
+    Alerts are stored in an in-memory fake Redis instead of REDIS_URL.
+    TestClient runs each request on its own event loop, so every request
+    gets a new client over the same fake server.
+    """
+    server = FakeServer()
+    
+    def alert_store() -> AlertStore:
+        return _fake_alert_store(server)
+    
+    def alert_evaluator(store: AlertStore = Depends(get_alert_store)) -> AlertEvaluator:
+        return AlertEvaluator(get_aggregator(), store)
+    
+    app.dependency_overrides[get_alert_store] = alert_store
+    app.dependency_overrides[get_alert_evaluator] = alert_evaluator
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def alert_store():
+    """Alert store on an empty in-memory fake Redis"""
+    return _fake_alert_store(FakeServer())
@@ -4,20 +4,16 @@ API endpoint tests
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
 
-
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
 
-def test_api_info():
+def test_api_info(client):
     """Test API info endpoint"""
     response = client.get("/api/v1/info")
     assert response.status_code == 200
@@ -25,7 +21,7 @@ def test_api_info():
     assert "version" in response.json()
 
 
-def test_get_trending_products():
+def test_get_trending_products(client):
     """Test trending products endpoint"""
     response = client.get("/api/v1/trends/products?limit=10")
     assert response.status_code == 200
@@ -33,7 +29,7 @@ def test_get_trending_products():
     assert isinstance(data, list)
 
 
-def test_get_trending_categories():
+def test_get_trending_categories(client):
     """Test trending categories endpoint"""
     response = client.get("/api/v1/trends/categories")
     assert response.status_code == 200
@@ -41,7 +37,7 @@ def test_get_trending_categories():
     assert isinstance(data, list)
 
 
-def test_create_alert():
+def test_create_alert(client):
     """Test alert creation"""
     alert_data = {
         "user_id": "test_user",
@@ -55,7 +51,7 @@ def test_create_alert():
     assert "id" in response.json()
 
 
-def test_get_event_recommendations():
+def test_get_event_recommendations(client):
     """Test event recommendations"""
     response = client.get("/api/v1/products/events?days_ahead=30")
     assert response.status_code == 200
@@ -64,7 +60,7 @@ def test_get_event_recommendations():
 
 
 @pytest.mark.asyncio
-async def test_invalid_product_id():
+async def test_invalid_product_id(client):
     """Test invalid product ID handling"""
     response = client.get("/api/v1/trends/products/invalid_id")
     assert response.status_code == 404
@@ -4,14 +4,10 @@ Integration tests for the complete system
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
 
 
 @pytest.mark.integration
-def test_complete_workflow():
+def test_complete_workflow(client):
     """Test complete user workflow"""
     
     # 1. Get trending products
@@ -43,7 +39,7 @@ def test_complete_workflow():
 
 
 @pytest.mark.integration
-def test_merchant_workflow():
+def test_merchant_workflow(client):
     """Test merchant-specific workflow"""
     
     # Get merchant insights
@@ -62,7 +58,7 @@ def test_merchant_workflow():
 
 
 @pytest.mark.integration
-def test_consumer_workflow():
+def test_consumer_workflow(client):
     """Test consumer-specific workflow"""
     
     # Get events
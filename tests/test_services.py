@@ -53,3 +53,687 @@ async def test_bedrock_agent_fallback():
     
     assert "trend_score" in fallback
     assert "confidence" in fallback
+
+
+def test_bedrock_fallbacks_are_plain_copies():
+    """Test fallbacks come back as plain, serializable dicts callers can modify"""
+    import orjson
+    from app.services.bedrock_agent import BedrockAgentService
+    
+    service = BedrockAgentService()
+    fallback = service._get_fallback_merchant_insights()
+    
+    assert type(fallback) is dict
+    assert type(fallback['sourcing_recommendations'][0]) is dict
+    assert type(fallback['risk_factors']) is list
+    orjson.dumps(fallback)
+    
+    fallback['risk_factors'].append('modified')
+    assert 'modified' not in service._get_fallback_merchant_insights()['risk_factors']
+
+
+
+def test_bedrock_prediction_coercion():
+    """Test prediction fields are coerced instead of rejecting the completion"""
+    from app.services.bedrock_agent import BedrockAgentService
+    
+    service = BedrockAgentService()
+    prediction = service._parse_prediction(
+        '{"confidence_score": "0.7", "duration_days": 14.5, "recommendation": 5, '
+        '"predicted_peak_date": 20250601, "factors": []}'
+    )
+    
+    assert prediction == {
+        'predicted_peak_date': '20250601',
+        'confidence_score': 0.7,
+        'duration_days': 14,
+        'recommendation': '5',
+        'factors': {}
+    }
+    assert service._parse_prediction('{"duration_days": 0}')['duration_days'] is None
+    assert service._parse_prediction('{}')['recommendation'] == 'No recommendation available'
+    assert service._parse_prediction('{"confidence_score": null}') == service._get_fallback_prediction()
+
+def test_ttl_cache_expiry(monkeypatch):
+    """Test TTLCache entries expire after their TTL"""
+    from app.utils import cache
+    
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    
+    ttl_cache = cache.TTLCache(maxsize=4, ttl=10)
+    ttl_cache.set("a", 1)
+    
+    now[0] = 109.9
+    assert ttl_cache.get("a") == 1
+    
+    now[0] = 110.0
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("a", "missing") == "missing"
+
+
+def test_ttl_cache_eviction(monkeypatch):
+    """Test a full TTLCache evicts expired entries first, then the oldest"""
+    from app.utils import cache
+    
+    now = [0.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    
+    ttl_cache = cache.TTLCache(maxsize=2, ttl=10)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("b") == 2
+    assert ttl_cache.get("c") == 3
+    
+    # Replacing an existing key does not evict
+    ttl_cache.set("c", 4)
+    assert ttl_cache.get("b") == 2
+    
+    # An expired entry is evicted before the oldest live one
+    now[0] = 5.0
+    ttl_cache.set("d", 5)  # evicts b, the oldest
+    now[0] = 12.0  # c has expired, d has not
+    ttl_cache.set("e", 6)
+    assert ttl_cache.get("d") == 5
+    assert ttl_cache.get("e") == 6
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_get_or_fetch_shares_fetch():
+    """Test concurrent misses for a key share one fetch"""
+    import asyncio
+    from app.utils.cache import TTLCache
+    
+    ttl_cache = TTLCache(maxsize=4, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+    
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return ["value"]
+    
+    waiters = [asyncio.create_task(ttl_cache.get_or_fetch("key", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    
+    assert calls == 1
+    assert results == [["value"]] * 3
+    assert await ttl_cache.get_or_fetch("key", fetch) == ["value"]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_get_or_fetch_skips_failures():
+    """Test failed fetches and results rejected by should_cache are not stored"""
+    from app.utils.cache import TTLCache
+    
+    ttl_cache = TTLCache(maxsize=4, ttl=60)
+    
+    async def failing():
+        raise RuntimeError("upstream down")
+    
+    with pytest.raises(RuntimeError):
+        await ttl_cache.get_or_fetch("key", failing)
+    assert ttl_cache.get("key") is None
+    
+    calls = 0
+    
+    async def fetch_empty():
+        nonlocal calls
+        calls += 1
+        return []
+    
+    assert await ttl_cache.get_or_fetch("key", fetch_empty, should_cache=bool) == []
+    assert await ttl_cache.get_or_fetch("key", fetch_empty, should_cache=bool) == []
+    assert calls == 2
+    assert ttl_cache.get("key") is None
+
+
+def test_build_cache_key_ignores_dependencies():
+    """Test injected dependencies are left out of response cache keys"""
+    from app.utils.cache import build_cache_key
+    
+    key = build_cache_key("trending_products", limit=10, categories=["Beauty"], aggregator=DataAggregator())
+    
+    assert key == build_cache_key("trending_products", limit=10, categories=["Beauty"], aggregator=object())
+    assert key == build_cache_key("trending_products", limit=10, categories=["Beauty"])
+    assert key != build_cache_key("trending_products", limit=20, categories=["Beauty"])
+    assert key != build_cache_key("trending_categories", limit=10, categories=["Beauty"])
+
+
+@pytest.mark.asyncio
+async def test_cached_skips_degraded_results(monkeypatch):
+    """Test cached does not store results rejected by should_cache"""
+    from app.utils import cache
+    
+    stored = {}
+    
+    async def get_raw(key):
+        return stored.get(key)
+    
+    async def set_raw(key, value, expire):
+        stored[key] = value
+    
+    monkeypatch.setattr(cache, "get_raw", get_raw)
+    monkeypatch.setattr(cache, "set_raw", set_raw)
+    
+    results = [[], [{"category": "Beauty"}]]
+    
+    @cache.cached("categories", should_cache=cache.has_results)
+    async def endpoint():
+        return results.pop(0)
+    
+    assert await endpoint() == []
+    assert not stored
+    assert await endpoint() == [{"category": "Beauty"}]
+    assert len(stored) == 1
+
+
+def _alert(alert_id, user_id="user_1", **fields):
+    from app.models.trends import Alert
+    
+    return Alert(id=alert_id, user_id=user_id, active=True, **fields)
+
+
+@pytest.mark.asyncio
+async def test_alert_store_save_and_get(alert_store):
+    """Test saved alerts round-trip and are indexed by user"""
+    alert = _alert("a1", keywords=["earbuds"], min_trend_score=0.6)
+    await alert_store.save(alert)
+    await alert_store.save(_alert("a2"))
+    await alert_store.save(_alert("a3", user_id="user_2"))
+    
+    assert await alert_store.get("a1") == alert
+    assert await alert_store.get("missing") is None
+    assert sorted(a.id for a in await alert_store.get_user_alerts("user_1")) == ["a1", "a2"]
+    assert [a.id for a in await alert_store.get_user_alerts("user_2")] == ["a3"]
+    assert await alert_store.get_user_alerts("nobody") == []
+    assert len(await alert_store.get_all()) == 3
+
+
+@pytest.mark.asyncio
+async def test_alert_store_delete(alert_store):
+    """Test deleting an alert removes it, its index entries and its state"""
+    alert = _alert("a1")
+    await alert_store.save(alert)
+    await alert_store.save(_alert("a2"))
+    await alert_store.save_state("a1", {"triggered": True}, expire=60)
+    
+    await alert_store.delete(alert)
+    
+    assert await alert_store.get("a1") is None
+    assert await alert_store.get_state("a1") is None
+    assert [a.id for a in await alert_store.get_user_alerts("user_1")] == ["a2"]
+    assert [a.id for a in await alert_store.get_all()] == ["a2"]
+
+
+@pytest.mark.asyncio
+async def test_alert_store_save_discards_state(alert_store):
+    """Test saving an updated alert drops its stale evaluation result"""
+    alert = _alert("a1", min_trend_score=0.9)
+    await alert_store.save(alert)
+    await alert_store.save_state("a1", {"triggered": False}, expire=60)
+    assert await alert_store.get_state("a1") == {"triggered": False}
+    
+    alert.min_trend_score = 0.5
+    await alert_store.save(alert)
+    
+    assert await alert_store.get_state("a1") is None
+    assert (await alert_store.get("a1")).min_trend_score == 0.5
+
+
+class _StubAggregator:
+    """Aggregator over a fixed product list that records its calls"""
+    
+    def __init__(self, products):
+        self.products = products
+        self.calls = []
+    
+    async def aggregate_product_trends(self, keywords, categories, days_back=7, min_trend_score=None, platforms=None):
+        self.calls.append({
+            "keywords": sorted(keywords),
+            "categories": sorted(categories),
+            "min_trend_score": min_trend_score,
+            "platforms": platforms
+        })
+        return [
+            p for p in self.products
+            if (min_trend_score is None or p.trend_score >= min_trend_score)
+            and (platforms is None or set(platforms) & set(p.platforms))
+        ]
+
+
+def _trend_product(product_id, platforms, trend_score):
+    return Product(
+        id=product_id,
+        name=f"Product {product_id}",
+        category="Electronics",
+        platforms=platforms,
+        trend_score=trend_score,
+        viral_velocity=0.5,
+        status="rising"
+    )
+
+
+def _old_check_alert(alert, products):
+    """Per-alert filtering as the alert check endpoint originally did it"""
+    return [
+        p.id for p in products
+        if p.trend_score >= alert.min_trend_score
+        and (not alert.platforms or any(pl in p.platforms for pl in alert.platforms))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_alert_evaluator_groups_and_filters(alert_store):
+    """Test alerts share one aggregation per search and keep their own criteria"""
+    from app.services.alert_evaluator import AlertEvaluator
+    
+    products = [
+        _trend_product("p1", ["tiktok"], 0.9),
+        _trend_product("p2", ["amazon"], 0.7),
+        _trend_product("p3", ["amazon", "tiktok"], 0.85),
+        _trend_product("p4", ["etsy"], 0.4),
+        _trend_product("p5", ["youtube"], 0.95)
+    ]
+    alerts = [
+        # Same search in a different keyword order; every alert has platforms
+        _alert("a1", keywords=["earbuds", "wireless"], min_trend_score=0.6, platforms=["tiktok"]),
+        _alert("a2", keywords=["wireless", "earbuds"], min_trend_score=0.8, platforms=["amazon"]),
+        # One alert without platforms, so the platform union is not pushed down
+        _alert("a3", keywords=["gadgets"], categories=["Electronics"], min_trend_score=0.9),
+        _alert("a4", keywords=["gadgets"], categories=["Electronics"], min_trend_score=0.3, platforms=["etsy"]),
+    ]
+    inactive = _alert("a5", keywords=["gadgets"], categories=["Electronics"], min_trend_score=0.0)
+    inactive.active = False
+    for alert in alerts + [inactive]:
+        await alert_store.save(alert)
+    
+    aggregator = _StubAggregator(products)
+    evaluator = AlertEvaluator(aggregator, alert_store)
+    
+    assert await evaluator.evaluate_all() == 4
+    
+    assert sorted(aggregator.calls, key=lambda call: call["keywords"]) == [
+        {"keywords": ["earbuds", "wireless"], "categories": [], "min_trend_score": 0.6, "platforms": ["amazon", "tiktok"]},
+        {"keywords": ["gadgets"], "categories": ["Electronics"], "min_trend_score": 0.3, "platforms": None}
+    ]
+    
+    for alert in alerts:
+        state = await alert_store.get_state(alert.id)
+        expected = _old_check_alert(alert, products)
+        assert [p["id"] for p in state["matching_products"]] == expected
+        assert state["triggered"] == bool(expected)
+    assert await alert_store.get_state("a5") is None
+
+
+@pytest.mark.asyncio
+async def test_alert_evaluator_single_alert(alert_store):
+    """Test evaluating one alert pushes its own criteria down"""
+    from app.services.alert_evaluator import AlertEvaluator
+    
+    products = [_trend_product("p1", ["tiktok"], 0.9), _trend_product("p2", ["amazon"], 0.95)]
+    aggregator = _StubAggregator(products)
+    evaluator = AlertEvaluator(aggregator, alert_store)
+    
+    alert = _alert("a1", keywords=["earbuds"], min_trend_score=0.8, platforms=["tiktok"])
+    state = await evaluator.evaluate(alert)
+    
+    assert aggregator.calls == [
+        {"keywords": ["earbuds"], "categories": [], "min_trend_score": 0.8, "platforms": ["tiktok"]}
+    ]
+    assert state["triggered"] is True
+    assert [p["id"] for p in state["matching_products"]] == ["p1"]
+    assert await alert_store.get_state("a1") == state
+
+
+def _prediction_input(product_id, engagement=1000, views=10000, history=(0.5,)):
+    return {
+        "id": product_id,
+        "platforms": ["tiktok"],
+        "aggregated_metrics": {"total_engagement": engagement, "total_views": views, "growth_rate": 0.2},
+        "historical_scores": list(history)
+    }
+
+
+def _stub_predictor(responses):
+    """SageMaker predictor whose endpoint returns the given results in turn"""
+    from app.services.sagemaker_predictor import SageMakerPredictor
+    
+    predictor = SageMakerPredictor()
+    predictor.payloads = []
+    
+    async def invoke(payload):
+        predictor.payloads.append(payload)
+        return responses.pop(0)
+    
+    predictor._invoke = invoke
+    return predictor
+
+
+@pytest.mark.asyncio
+async def test_sagemaker_batch_demultiplexes_predictions():
+    """Test batch results are split per instance, including per-instance confidence"""
+    predictor = _stub_predictor([
+        {"predictions": [[0.9], 0.1], "confidence": [0.8, 0.6], "model_version": "2.0"}
+    ])
+    
+    results = await predictor.batch_predict([
+        _prediction_input("p1", engagement=5000),
+        _prediction_input("p2", engagement=100)
+    ])
+    
+    assert len(predictor.payloads[0]["instances"]) == 2
+    assert [r["product_id"] for r in results] == ["p1", "p2"]
+    assert [r["trend_score"] for r in results] == [0.9, 0.1]
+    assert [r["trend_direction"] for r in results] == ["strongly_rising", "strongly_declining"]
+    assert [r["confidence"] for r in results] == [0.8, 0.6]
+    assert all(r["model_version"] == "2.0" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_sagemaker_batch_dedupes_inputs():
+    """Test identical inputs are sent once and repeat calls are served from cache"""
+    predictor = _stub_predictor([{"predictions": [0.7, 0.3], "confidence": 0.9}])
+    products = [
+        _prediction_input("p1"),
+        _prediction_input("p2", engagement=50),
+        _prediction_input("p3")  # Same features and history as p1
+    ]
+    
+    results = await predictor.batch_predict(products)
+    
+    assert len(predictor.payloads) == 1
+    assert len(predictor.payloads[0]["instances"]) == 2
+    assert [(r["product_id"], r["trend_score"]) for r in results] == [("p1", 0.7), ("p2", 0.3), ("p3", 0.7)]
+    
+    # Cached predictions skip the endpoint
+    cached = await predictor.batch_predict(products)
+    assert len(predictor.payloads) == 1
+    assert [(r["product_id"], r["trend_score"]) for r in cached] == [("p1", 0.7), ("p2", 0.3), ("p3", 0.7)]
+
+
+@pytest.mark.asyncio
+async def test_sagemaker_batch_count_mismatch_falls_back():
+    """Test a result with the wrong number of predictions yields fallbacks for the chunk"""
+    predictor = _stub_predictor([{"predictions": [0.7]}])
+    
+    results = await predictor.batch_predict([_prediction_input("p1"), _prediction_input("p2", engagement=50)])
+    
+    assert [r["product_id"] for r in results] == ["p1", "p2"]
+    assert all(r["trend_score"] == 0.5 and r["confidence"] == 0.0 and "error" in r for r in results)
+
+
+@pytest.mark.asyncio
+async def test_calculate_trend_scores():
+    """Test bulk trend scoring against hand-computed scores"""
+    from datetime import datetime, timedelta
+    from app.models.trends import PlatformMetrics, TrendStatus
+    
+    now = datetime(2025, 6, 1, 12, 0)
+    
+    def metrics(platform, engagement, views, growth):
+        return PlatformMetrics(
+            platform=platform,
+            engagement_count=engagement,
+            views=views,
+            likes=0,
+            shares=0,
+            comments=0,
+            mentions=1,
+            growth_rate=growth,
+            timestamp=now
+        )
+    
+    def product(product_id, platforms, platform_metrics, first_seen):
+        return Product(
+            id=product_id,
+            name=f"Product {product_id}",
+            category="General",
+            platforms=platforms,
+            platform_metrics=platform_metrics,
+            first_seen=first_seen,
+            last_updated=now
+        )
+    
+    products = [
+        # TikTok (weight 0.20) plus an unknown platform (weight 0.1)
+        product("mixed", ["tiktok", "myspace"], {
+            "tiktok": metrics("tiktok", 200000, 2000000, 0.5),
+            "myspace": metrics("myspace", 100000, 1000000, 1.0)
+        }, now - timedelta(days=2)),
+        # No platform metrics: only the platform count contributes
+        product("bare", ["amazon"], {}, now - timedelta(days=10)),
+        # Seen hours ago, so 0 days active counts as 1
+        product("new", ["youtube"], {
+            "youtube": metrics("youtube", 1000000, 10000000, 5.0)
+        }, now - timedelta(hours=5))
+    ]
+    
+    aggregator = DataAggregator()
+    scored = await aggregator._calculate_trend_scores(products, now)
+    
+    # engagement 50000/1e5, views 500000/1e6, growth 0.2, platforms 2/5
+    assert scored[0].trend_score == pytest.approx(0.5 * 0.35 + 0.5 * 0.25 + 0.2 * 0.30 + 0.4 * 0.10)
+    assert scored[0].viral_velocity == pytest.approx(0.2 / 2)
+    assert scored[0].status == TrendStatus.STABLE
+    
+    assert scored[1].trend_score == pytest.approx(0.2 * 0.10)
+    assert scored[1].viral_velocity == 0
+    assert scored[1].status == TrendStatus.STABLE
+    
+    # Engagement, views and growth are capped at 1
+    assert scored[2].trend_score == pytest.approx(0.35 + 0.25 + 0.30 + 0.2 * 0.10)
+    assert scored[2].viral_velocity == pytest.approx(1.0)
+    assert scored[2].status == TrendStatus.EMERGING
+
+
+def test_determine_trend_statuses_rule_order():
+    """Test vectorized status rules keep the first-match priority of the original chain"""
+    import numpy as np
+    from app.models.trends import TrendStatus
+    
+    def original(score, velocity, days_active):
+        if velocity > 0.8 and days_active < 3:
+            return TrendStatus.EMERGING
+        elif score > 0.7 and velocity > 0.5:
+            return TrendStatus.RISING
+        elif score > 0.8 and velocity < 0.3:
+            return TrendStatus.PEAK
+        elif score < 0.5 and velocity < 0:
+            return TrendStatus.DECLINING
+        else:
+            return TrendStatus.STABLE
+    
+    # (score, velocity, days active, expected status)
+    cases = [
+        (0.85, 0.6, 10, TrendStatus.RISING),
+        (0.9, 0.9, 1, TrendStatus.EMERGING),  # Also rising; emerging comes first
+        (0.9, 0.8, 1, TrendStatus.RISING),  # Velocity of exactly 0.8 is not emerging
+        (0.5, 0.9, 3, TrendStatus.STABLE),  # 3 days active is not emerging
+        (0.9, 0.9, 2, TrendStatus.EMERGING),
+        (0.85, 0.2, 10, TrendStatus.PEAK),
+        (0.8, 0.2, 10, TrendStatus.STABLE),  # Score of exactly 0.8 is not peak
+        (0.7, 0.6, 10, TrendStatus.STABLE),  # Score of exactly 0.7 is not rising
+        (0.4, -0.1, 10, TrendStatus.DECLINING),
+        (0.5, -0.1, 10, TrendStatus.STABLE),  # Score of exactly 0.5 is not declining
+        (0.4, 0.0, 10, TrendStatus.STABLE)
+    ]
+    scores, velocities, days_active, expected = zip(*cases)
+    
+    statuses = DataAggregator()._determine_trend_statuses(
+        np.array(scores), np.array(velocities), np.array(days_active)
+    )
+    
+    assert statuses == list(expected)
+    assert statuses == [original(*case[:3]) for case in cases]
+
+
+def _alert_notifier():
+    import os
+    
+    # boto3 resources are created at import and need a region
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    from lambda_functions import alert_notifier
+    
+    return alert_notifier
+
+
+def _old_lambda_check_alert(alert, products):
+    """Alert matching as the notifier Lambda originally did it, by product ID"""
+    matched = []
+    keywords = alert.get('keywords', [])
+    categories = alert.get('categories', [])
+    platforms = alert.get('platforms', [])
+    for product in products:
+        if product.get('trend_score', 0) < alert.get('min_trend_score', 0.7):
+            continue
+        if keywords:
+            text = f"{product.get('name', '')} {product.get('description', '')}".lower()
+            if not any(kw.lower() in text for kw in keywords):
+                continue
+        if categories and product.get('category') not in categories:
+            continue
+        if platforms and not any(pl in product.get('platforms', []) for pl in platforms):
+            continue
+        matched.append(product['id'])
+    return matched
+
+
+def test_lambda_check_alert_matches_original():
+    """Test indexed Lambda alert matching against the original per-product checks"""
+    notifier = _alert_notifier()
+    
+    products = [
+        {'id': 'p1', 'name': 'Wireless Earbuds', 'description': 'Noise cancelling', 'category': 'Electronics', 'platforms': ['amazon', 'tiktok'], 'trend_score': 0.9},
+        {'id': 'p2', 'name': 'Yoga Mat', 'description': 'Non-slip', 'category': 'Sports & Outdoors', 'platforms': ['instagram'], 'trend_score': 0.8},
+        {'id': 'p3', 'name': 'Gaming Mouse', 'description': 'RGB earbuds bundle', 'category': 'Electronics', 'platforms': ['youtube'], 'trend_score': 0.75},
+        {'id': 'p4', 'name': 'LED Strip', 'category': 'Home & Garden', 'platforms': ['tiktok'], 'trend_score': 0.95},
+        {'id': 'p5', 'name': 'Phone Charger', 'description': 'Fast (USB-C)', 'category': 'Electronics', 'platforms': ['amazon'], 'trend_score': 0.5}
+    ]
+    # Scanned in two segments; products keep scan order
+    products_index, index = notifier.build_product_index([products[:2], products[2:]])
+    assert products_index == products
+    
+    cases = [
+        ({'categories': ['Electronics'], 'min_trend_score': 0.6}, ['p1', 'p3']),
+        ({'platforms': ['tiktok'], 'min_trend_score': 0.6}, ['p1', 'p4']),
+        ({'categories': ['Electronics', 'Home & Garden'], 'platforms': ['tiktok', 'youtube'], 'min_trend_score': 0.6}, ['p1', 'p3', 'p4']),
+        ({'keywords': ['EARBUDS'], 'min_trend_score': 0.6}, ['p1', 'p3']),
+        ({'keywords': ['earbuds'], 'platforms': ['youtube'], 'min_trend_score': 0.6}, ['p3']),
+        ({'keywords': ['(usb-c)'], 'min_trend_score': 0.0}, ['p5']),
+        ({'keywords': [], 'min_trend_score': 0.8}, ['p1', 'p2', 'p4']),
+        ({}, ['p1', 'p2', 'p3', 'p4']),
+        ({'categories': ['Books & Media']}, []),
+        ({'platforms': ['etsy']}, [])
+    ]
+    for alert, expected in cases:
+        matched = [p['id'] for p in notifier.check_alert(alert, products_index, index)]
+        assert matched == expected, alert
+        assert matched == _old_lambda_check_alert(alert, products), alert
+
+
+
+def test_lambda_bulk_notifications_count_successes(monkeypatch):
+    """Test bulk sends count only destinations SES accepted"""
+    notifier = _alert_notifier()
+    
+    calls = []
+    
+    class StubSES:
+        def send_bulk_templated_email(self, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise RuntimeError("throttled")
+            return {'Status': [
+                {'Status': 'Success', 'MessageId': 'm1'},
+                {'Status': 'MessageRejected', 'Error': 'Email address is not verified'}
+            ][:len(kwargs['Destinations'])]}
+    
+    monkeypatch.setattr(notifier, "ses", StubSES())
+    monkeypatch.setattr(notifier, "ses_template_name", "trend-alert")
+    monkeypatch.setattr(notifier, "SES_BULK_LIMIT", 2)
+    
+    product = {'name': 'Yoga Mat', 'category': 'Sports & Outdoors', 'platforms': ['instagram'], 'trend_score': 0.8}
+    notifications = [
+        ({'id': f'a{i}', 'user_email': f'user{i}@example.com'}, [product])
+        for i in range(5)
+    ]
+    notifications.insert(1, ({'id': 'no-email'}, [product]))
+    
+    # First batch: one accepted, one rejected; second batch raises; third: one accepted
+    assert notifier.send_bulk_notifications(notifications) == 2
+    assert len(calls) == 3
+
+
+def test_lambda_update_products_skips_deleted():
+    """Test score write-backs only update products that still exist"""
+    import os
+    from botocore.exceptions import ClientError
+    
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    from lambda_functions import trend_analyzer
+    
+    class StubTable:
+        def __init__(self):
+            self.items = {'p1': {'id': 'p1', 'name': 'Yoga Mat', 'trend_score': 0.5}}
+        
+        def update_item(self, Key, UpdateExpression, ConditionExpression, ExpressionAttributeValues):
+            assert ConditionExpression == 'attribute_exists(id)'
+            item = self.items.get(Key['id'])
+            if item is None:
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+            item['trend_score'] = ExpressionAttributeValues[':score']
+            item['last_analyzed'] = ExpressionAttributeValues[':analyzed']
+    
+    table = StubTable()
+    trend_analyzer.update_products(table, {'products': [
+        {'id': 'p1', 'trend_score': 0.75, 'last_analyzed': '2025-01-01T00:00:00'},
+        {'id': 'deleted', 'trend_score': 0.9, 'last_analyzed': '2025-01-01T00:00:00'}
+    ]})
+    
+    assert list(table.items) == ['p1']
+    assert table.items['p1']['name'] == 'Yoga Mat'
+    assert float(table.items['p1']['trend_score']) == 0.75
+
+def test_amazon_q_compliance_terms_match_substring_checks():
+    """Test term scanning gives the same compliance results as substring checks"""
+    from app.services.amazon_q_service import AmazonQService, _parse_response
+    
+    def old_check_compliance(message):
+        message = message.lower()
+        return not any(kw in message for kw in ['not compliant', 'violates', 'prohibited', 'restricted'])
+    
+    def old_platform_compliance(message):
+        message = message.lower()
+        compliant = 'compliant' in message or 'allowed' in message
+        return {
+            platform: compliant if platform in message else True
+            for platform in ['amazon', 'ebay', 'walmart', 'etsy', 'target']
+        }
+    
+    messages = [
+        "",
+        "This product is compliant on Amazon.",
+        "This product is NOT COMPLIANT with eBay rules.",
+        "Listing is noncompliant on Walmart.",
+        "Resale is disallowed on Etsy.",
+        "Sales are prohibited and restricted on Target.",
+        "Listing violates policy.",
+        "Amazon-compliant packaging",
+        "amazoncompliant",
+        "Shipping via targetsy is allowed",
+        "walmartarget listings are restricted",
+        "Allowed everywhere except where not compliant."
+    ]
+    service = AmazonQService()
+    
+    for message in messages:
+        parsed = _parse_response({'systemMessage': message})
+        assert service._check_compliance(parsed) == old_check_compliance(message), message
+        assert service._parse_platform_compliance(parsed) == old_platform_compliance(message), message